@@ -0,0 +1,9 @@
+"""
+서비스 계층 벤치마크
+
+    python -m benchmarks.generate --size 1m
+    python -m benchmarks.run --size 1m --output baseline-1m.json   # 변경 전 기준 결과 저장
+    python -m benchmarks.run --size 1m --baseline baseline-1m.json # 변경 후 기준과 비교
+
+기준 결과는 실행한 머신에 따라 다르므로 저장소에 두지 않고 비교할 머신에서 직접 만든다.
+"""
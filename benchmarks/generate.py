@@ -0,0 +1,174 @@
+"""
+벤치마크용 합성 데이터 생성 (고정 시드)
+
+판매는 (input_date, payment_type)이 유일하므로 행 수는 기간(일 수) x 결제 타입 수로 맞춘다.
+날씨는 날짜마다 한 행을 만든다.
+"""
+import argparse
+import math
+import os
+import random
+import sqlite3
+from datetime import date, datetime, timedelta
+from typing import Dict, NamedTuple
+
+from sqlmodel import SQLModel, create_engine
+
+from core.migrations import run_migrations
+from models.data_version import DataVersion  # noqa: F401  (테이블 등록)
+from models.sale import SYNC_DONE
+from models.sale_daily import SaleDaily  # noqa: F401  (테이블 등록)
+from models.sale_statistics import SaleStatistics  # noqa: F401
+from models.weather import Weather  # noqa: F401
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), ".data")
+START_DATE = date(2010, 1, 1)
+INSERT_BATCH_SIZE = 100_000
+# 요일별 매출 가중치 (월 ~ 일)
+WEEKDAY_WEIGHTS = (0.9, 0.95, 1.0, 1.0, 1.15, 1.35, 1.25)
+WEATHER_SUMMARIES = ("맑음", "흐림", "강우")
+
+
+class SizePreset(NamedTuple):
+    rows: int
+    years: int
+
+
+SIZES: Dict[str, SizePreset] = {
+    "10k": SizePreset(rows=10_000, years=3),
+    "1m": SizePreset(rows=1_000_000, years=10),
+    "10m": SizePreset(rows=10_000_000, years=20),
+}
+
+
+def database_path(size: str, seed: int) -> str:
+    return os.path.join(DATA_DIR, f"sales-{size}-{seed}.db")
+
+
+def _sale_rows(preset: SizePreset, seed: int):
+    rng = random.Random(seed)
+    days = (date(START_DATE.year + preset.years, 1, 1) - START_DATE).days
+    payment_types = math.ceil(preset.rows / days)
+    # 결제 타입별 평균 금액 (일부 타입에 매출이 몰리도록)
+    type_scale = [rng.lognormvariate(11, 1) for _ in range(payment_types)]
+    created_at = datetime(2024, 1, 1).isoformat(sep=" ")
+
+    # 전체 (날짜, 결제 타입) 조합 중 rows개를 기간 전체에 고르게 선택
+    pairs = days * payment_types
+    pair = 0
+    for offset in range(days):
+        current = START_DATE + timedelta(days=offset)
+        season = 1 + 0.2 * math.sin(2 * math.pi * current.timetuple().tm_yday / 365)
+        weight = WEEKDAY_WEIGHTS[current.weekday()] * season
+        input_date = current.isoformat()
+        for index in range(payment_types):
+            pair += 1
+            if pair * preset.rows // pairs == (pair - 1) * preset.rows // pairs:
+                continue
+            amount = max(1, int(type_scale[index] * weight * rng.uniform(0.5, 1.5)))
+            yield input_date, f"type{index:04d}", amount, created_at, SYNC_DONE
+
+
+def _weather_rows(preset: SizePreset, seed: int):
+    rng = random.Random(seed + 1)
+    days = (date(START_DATE.year + preset.years, 1, 1) - START_DATE).days
+    for offset in range(days):
+        current = START_DATE + timedelta(days=offset)
+        season = -10 * math.cos(2 * math.pi * (current.timetuple().tm_yday - 15) / 365)
+        avg_temp = round(13 + season + rng.uniform(-3, 3), 1)
+        rain = rng.choice([0.0, 0.0, 0.0, round(rng.uniform(0.1, 40), 1)])
+        summary = "강우" if rain else rng.choice(WEATHER_SUMMARIES[:2])
+        yield (
+            current.isoformat(),
+            avg_temp,
+            round(avg_temp - rng.uniform(2, 7), 1),
+            round(avg_temp + rng.uniform(2, 7), 1),
+            rain,
+            round(rng.uniform(30, 95), 1),
+            round(rain / 4, 1),
+            summary,
+        )
+
+
+def _insert_batches(conn: sqlite3.Connection, sql: str, rows) -> None:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == INSERT_BATCH_SIZE:
+            conn.executemany(sql, batch)
+            batch = []
+    if batch:
+        conn.executemany(sql, batch)
+
+
+def generate_database(path: str, size: str, seed: int = 42) -> str:
+    """
+    size 프리셋의 판매/날씨/일별 롤업 테이블을 가진 SQLite DB 생성
+    """
+    preset = SIZES[size]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        os.remove(path)
+
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    engine.dispose()
+
+    conn = sqlite3.connect(path)
+    _insert_batches(
+        conn,
+        "INSERT INTO sale (input_date, payment_type, amount, created_at, sync_status) VALUES (?, ?, ?, ?, ?)",
+        _sale_rows(preset, seed),
+    )
+    _insert_batches(
+        conn,
+        """
+        INSERT INTO weather (date, avg_temp, min_temp, max_temp, sum_rain, avg_humidity, one_hour_rain, summary)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        _weather_rows(preset, seed),
+    )
+    conn.execute(
+        """
+        INSERT INTO sale_daily (input_date, payment_type, total_amount, transaction_count)
+        SELECT input_date, payment_type, SUM(amount), COUNT(*)
+        FROM sale
+        GROUP BY input_date, payment_type
+        """
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    return path
+
+
+def ensure_database(size: str, seed: int = 42) -> str:
+    """
+    생성된 DB가 있으면 재사용하고 없으면 생성
+
+    재사용하는 DB에는 이후 추가된 테이블과 마이그레이션을 적용한다. (애플리케이션 시작과 같은 순서)
+    """
+    path = database_path(size, seed)
+    if not os.path.exists(path):
+        generate_database(path, size, seed)
+    else:
+        engine = create_engine(f"sqlite:///{path}")
+        SQLModel.metadata.create_all(engine)
+        run_migrations(engine)
+        engine.dispose()
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic sales/weather database for benchmarks")
+    parser.add_argument("--size", choices=sorted(SIZES), default="10k", help="Size preset")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--db", help="Output DB path (default: benchmarks/.data/sales-<size>-<seed>.db)")
+    args = parser.parse_args()
+
+    path = generate_database(args.db or database_path(args.size, args.seed), args.size, args.seed)
+    print(f"Generated {SIZES[args.size].rows} sales in {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+HTTP 부하 테스트
+
+합성 DB(benchmarks.generate)의 복사본과 로컬 KMA 대체 서버(scripts.kma_stub)로 앱을 띄우고,
+조회/쓰기 요청을 정해진 비율로 섞어 동시성 단계별로 보낸 뒤
+경로별 p50/p95/p99 지연 시간, 처리량, 오류율을 보고한다.
+
+    python -m benchmarks.load --size 10k --concurrency 1,8,32 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import httpx
+
+from benchmarks.generate import SIZES, START_DATE, ensure_database
+
+APP_PORT = 8100
+KMA_STUB_PORT = 8101
+KMA_STUB_PATH = "/1360000/AsosDalyInfoService/getWthrDataList"
+STARTUP_TIMEOUT = 30.0
+REQUEST_TIMEOUT = 30.0
+
+# 경로별 기본 요청 비율 (대시보드 조회 위주 + 판매 쓰기)
+DEFAULT_MIX = (
+    "sale_list=25,sale_month=15,statistics=15,statistics_summary=10,"
+    "statistics_daily=10,statistics_weather=10,weather=5,sale_create=5,sale_update=4,weather_sync=1"
+)
+
+
+class Request(NamedTuple):
+    method: str
+    url: str
+    json: Optional[dict] = None
+
+
+class Route(NamedTuple):
+    build: Callable[["Dataset", random.Random], Request]
+    ok_statuses: Tuple[int, ...] = (200,)
+
+
+class Dataset:
+    """
+    생성된 데이터의 날짜/결제 타입 범위와 새로 쓸 판매 날짜
+    """
+
+    def __init__(self, size: str) -> None:
+        preset = SIZES[size]
+        self.days = (date(START_DATE.year + preset.years, 1, 1) - START_DATE).days
+        self.payment_types = math.ceil(preset.rows / self.days)
+        self._next_new_day = self.days
+
+    def random_date(self, rng: random.Random) -> date:
+        return START_DATE + timedelta(days=rng.randrange(self.days))
+
+    def random_month(self, rng: random.Random) -> str:
+        return self.random_date(rng).strftime("%Y-%m")
+
+    def random_payment_type(self, rng: random.Random) -> str:
+        return f"type{rng.randrange(self.payment_types):04d}"
+
+    def new_date(self) -> str:
+        # 생성 범위 이후 날짜를 차례로 사용해 (날짜, 결제 타입) 중복을 피한다
+        new_day = START_DATE + timedelta(days=self._next_new_day)
+        self._next_new_day += 1
+        return new_day.isoformat()
+
+
+ROUTES: Dict[str, Route] = {
+    "sale_list": Route(lambda data, rng: Request("GET", f"/sale?page={rng.randint(1, 50)}&page_size=20")),
+    "sale_month": Route(lambda data, rng: Request("GET", f"/sale/month/?key={data.random_month(rng)}")),
+    "statistics": Route(lambda data, rng: Request("GET", "/statistics?period_type=month&payment_type=all")),
+    "statistics_summary": Route(
+        lambda data, rng: Request("GET", f"/statistics/summary/{rng.choice(['week', 'month'])}")
+    ),
+    "statistics_daily": Route(
+        lambda data, rng: Request("GET", f"/statistics/daily?start_date={data.random_month(rng)}-01")
+    ),
+    "statistics_weather": Route(lambda data, rng: Request("GET", "/statistics/weather/monthly")),
+    "weather": Route(lambda data, rng: Request("GET", f"/weather?month={data.random_month(rng)}")),
+    "sale_create": Route(
+        lambda data, rng: Request(
+            "POST",
+            "/sale",
+            {"input_date": data.new_date(), "payment_type": "type0000", "amount": rng.randint(1000, 500000)},
+        )
+    ),
+    "sale_update": Route(
+        lambda data, rng: Request(
+            "PATCH",
+            "/sale",
+            {
+                "input_date": data.random_date(rng).isoformat(),
+                "payment_type": data.random_payment_type(rng),
+                "amount": rng.randint(1000, 500000),
+            },
+        ),
+        # 생성 데이터에 없는 (날짜, 결제 타입) 조합은 404
+        ok_statuses=(200, 404),
+    ),
+    # 새 판매 날짜의 날씨를 KMA 대체 서버에서 동기화 (동기화할 날짜가 없으면 404)
+    "weather_sync": Route(lambda data, rng: Request("POST", "/weather"), ok_statuses=(200, 404)),
+}
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights: Dict[str, float] = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ROUTES:
+            raise SystemExit(f"Unknown route '{name}' (choose from {', '.join(ROUTES)})")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    # nearest-rank
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(q / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+@contextmanager
+def _server(module: str, port: int, env: Dict[str, str], log_path: str) -> Iterator[str]:
+    with open(log_path, "w", encoding="utf-8") as log:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", module, "--port", str(port), "--log-level", "warning"],
+            env={**os.environ, **env},
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while True:
+            if process.poll() is not None:
+                raise SystemExit(f"{module} exited during startup (see {log_path})")
+            try:
+                httpx.get(f"{base_url}/openapi.json", timeout=1.0)
+                break
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise SystemExit(f"{module} did not start within {STARTUP_TIMEOUT}s (see {log_path})")
+                time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait()
+
+
+async def run_level(
+    base_url: str,
+    dataset: Dataset,
+    weights: Dict[str, float],
+    concurrency: int,
+    duration: float,
+    seed: int,
+) -> Dict[str, dict]:
+    names = list(weights)
+    route_weights = [weights[name] for name in names]
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    deadline = time.monotonic() + duration
+
+    async def worker(index: int, client: httpx.AsyncClient) -> None:
+        rng = random.Random(seed * 1000 + index)
+        while time.monotonic() < deadline:
+            name = rng.choices(names, route_weights)[0]
+            route = ROUTES[name]
+            request = route.build(dataset, rng)
+            started = time.perf_counter()
+            try:
+                response = await client.request(request.method, request.url, json=request.json)
+                failed = response.status_code not in route.ok_statuses
+            except httpx.HTTPError:
+                failed = True
+            latencies[name].append(time.perf_counter() - started)
+            if failed:
+                errors[name] += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    started = time.perf_counter()
+    async with httpx.AsyncClient(base_url=base_url, timeout=REQUEST_TIMEOUT, limits=limits) as client:
+        await asyncio.gather(*(worker(index, client) for index in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    report: Dict[str, dict] = {}
+    for name in names:
+        values = sorted(latencies[name])
+        if not values:
+            continue
+        report[name] = {
+            "requests": len(values),
+            "throughput_rps": round(len(values) / elapsed, 2),
+            "error_rate": round(errors[name] / len(values), 4),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+        }
+    return report
+
+
+def print_level(concurrency: int, report: Dict[str, dict]) -> None:
+    total = sum(route["requests"] for route in report.values())
+    rps = sum(route["throughput_rps"] for route in report.values())
+    print(f"\nconcurrency {concurrency}: {total} requests, {rps:.1f} req/s")
+    print(f"  {'route':<20} {'req':>6} {'req/s':>8} {'err%':>6} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, route in report.items():
+        print(
+            f"  {name:<20} {route['requests']:>6} {route['throughput_rps']:>8.1f} "
+            f"{route['error_rate'] * 100:>5.1f}% {route['p50_ms']:>7.1f}ms "
+            f"{route['p95_ms']:>7.1f}ms {route['p99_ms']:>7.1f}ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the HTTP API against a generated database")
+    parser.add_argument("--size", choices=sorted(SIZES), default="10k", help="Size preset")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per concurrency level")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Route weights, e.g. sale_list=3,sale_create=1")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    weights = parse_mix(args.mix)
+    levels = [int(level) for level in args.concurrency.split(",")]
+    source = ensure_database(args.size, args.seed)
+
+    results: Dict[str, Dict[str, dict]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # 쓰기 요청이 있으므로 생성된 DB의 복사본 사용
+        db_path = os.path.join(tmp, "sales.db")
+        shutil.copyfile(source, db_path)
+
+        with _server("scripts.kma_stub:app", KMA_STUB_PORT, {}, os.path.join(tmp, "kma_stub.log")) as kma_url:
+            app_env = {
+                "DATABASE_URL": f"sqlite:///{db_path}",
+                "KMA_API_URL": f"{kma_url}{KMA_STUB_PATH}",
+                "KMA_CACHE_MODE": "off",
+            }
+            with _server("main:app", APP_PORT, app_env, os.path.join(tmp, "app.log")) as app_url:
+                dataset = Dataset(args.size)
+                for concurrency in levels:
+                    report = asyncio.run(
+                        run_level(app_url, dataset, weights, concurrency, args.duration, args.seed)
+                    )
+                    results[str(concurrency)] = report
+                    print_level(concurrency, report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "meta": {
+                        "size": args.size,
+                        "seed": args.seed,
+                        "duration": args.duration,
+                        "mix": weights,
+                    },
+                    "levels": results,
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+서비스 계층 벤치마크 실행
+
+합성 DB에서 주요 서비스 함수의 지연 시간과 최대 메모리(tracemalloc)를 측정해 JSON으로 기록하고,
+기준(baseline) 결과가 주어지면 중앙값 지연 시간을 비교한다.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple
+
+import numpy
+import sqlalchemy
+from sqlmodel import Session
+
+from benchmarks.generate import SIZES, ensure_database
+from core.engine import create_app_engine
+from service.sale import export_sales, get_sale_by_month, get_sales
+from service.sale_statistics import (
+    get_daily_sales_statistics,
+    get_statistics_json,
+    get_weather_monthly_sales_trend,
+    recompute_statistics,
+    shutdown_recompute_executors,
+)
+
+# 기준 대비 이 배수를 넘게 느려지면 실패
+DEFAULT_MAX_REGRESSION = 1.2
+
+
+class Case(NamedTuple):
+    name: str
+    run: Callable[[Session], object]
+
+
+CASES: List[Case] = [
+    Case("get_sales", lambda session: get_sales(session, page=1, page_size=10)),
+    Case("get_sales_deep_page", lambda session: get_sales(session, page=100, page_size=10)),
+    Case("get_sale_by_month", lambda session: get_sale_by_month(session, "2010-06")),
+    Case("recompute_statistics", recompute_statistics),
+    # 공유 프로세스 풀로 항상 병렬 집계 (풀 시작 비용은 예열 실행에 포함)
+    Case(
+        "recompute_statistics_parallel",
+        lambda session: recompute_statistics(session, workers=4, parallel_min_rows=0),
+    ),
+    Case("get_weather_monthly_sales_trend", get_weather_monthly_sales_trend),
+    Case("get_daily_sales_statistics", get_daily_sales_statistics),
+    Case("get_statistics_json", get_statistics_json),
+    # 전체 판매 CSV 내보내기 (스트림을 끝까지 소비, 메모리는 청크 크기에 비례해야 함)
+    Case("export_sales", lambda session: sum(map(len, export_sales(engine=session.get_bind())))),
+]
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def measure_case(engine, case: Case, repeat: int) -> Dict[str, float]:
+    # 첫 실행은 캐시 예열용으로 제외
+    with Session(engine) as session:
+        case.run(session)
+
+    timings: List[float] = []
+    for _ in range(repeat):
+        with Session(engine) as session:
+            started = time.perf_counter()
+            case.run(session)
+            timings.append(time.perf_counter() - started)
+
+    # 메모리는 시간 측정과 분리해 한 번만 측정 (tracemalloc이 실행을 느리게 함)
+    with Session(engine) as session:
+        tracemalloc.start()
+        case.run(session)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "min_ms": round(min(timings) * 1000, 3),
+        "max_ms": round(max(timings) * 1000, 3),
+        "peak_memory_bytes": peak,
+    }
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], max_regression: float) -> bool:
+    ok = True
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            print(f"  {name}: no baseline")
+            continue
+        ratio = result["median_ms"] / base["median_ms"] if base["median_ms"] else float("inf")
+        memory_ratio = result["peak_memory_bytes"] / base["peak_memory_bytes"] if base["peak_memory_bytes"] else 1.0
+        status = "ok"
+        if ratio > max_regression:
+            status = "SLOWER"
+            ok = False
+        print(f"  {name}: {ratio:.2f}x time, {memory_ratio:.2f}x memory [{status}]")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark service-layer functions on a synthetic database")
+    parser.add_argument("--size", choices=sorted(SIZES), default="10k", help="Size preset")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the generated data")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--case", action="append", help="Run only the named case (repeatable)")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Compare against a previous JSON result")
+    parser.add_argument("--max-regression", type=float, default=DEFAULT_MAX_REGRESSION,
+                        help="Fail when a median is this many times slower than the baseline")
+    args = parser.parse_args()
+
+    path = ensure_database(args.size, args.seed)
+    engine = create_app_engine(f"sqlite:///{path}")
+
+    results: Dict[str, Dict[str, float]] = {}
+    for case in CASES:
+        if args.case and case.name not in args.case:
+            continue
+        results[case.name] = measure_case(engine, case, args.repeat)
+        result = results[case.name]
+        print(
+            f"{case.name}: median {result['median_ms']:.1f}ms "
+            f"(min {result['min_ms']:.1f}ms), peak {result['peak_memory_bytes'] / 1024 / 1024:.1f}MB"
+        )
+    engine.dispose()
+    shutdown_recompute_executors()
+
+    report = {
+        "meta": {
+            "size": args.size,
+            "rows": SIZES[args.size].rows,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "git_revision": _git_revision(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "numpy": numpy.__version__,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"Compared with {args.baseline} ({baseline['meta'].get('git_revision', '')}):")
+        if not compare(results, baseline["results"], args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+응답 직렬화 벤치마크
+
+같은 조회 결과를 기존 경로(응답 모델 생성 + jsonable_encoder + json.dumps)와
+빠른 경로(서비스의 *_json 함수, SQL 행 -> orjson)로 만들어 지연 시간을 비교하고 두 본문이 같은지 확인한다.
+시계열 응답은 열 단위(columnar) 형식의 본문 크기와 지연 시간도 기본 형식과 비교한다.
+
+    python -m benchmarks.serialization --size 1m
+"""
+import argparse
+import json
+import statistics
+import time
+from typing import Callable, List, NamedTuple
+
+from fastapi.encoders import jsonable_encoder
+from sqlmodel import Session, func, select
+
+from benchmarks.generate import SIZES, ensure_database
+from core.engine import create_app_engine
+from models.sale_statistics import SaleStatistics
+from service.sale import get_sale_by_month_json, get_sales, get_sales_json
+from service.sale_statistics import (
+    get_daily_sales_statistics,
+    get_daily_sales_statistics_json,
+    get_statistics,
+    get_statistics_json,
+    recompute_statistics,
+)
+
+
+class Pair(NamedTuple):
+    name: str
+    models: Callable[[Session], object]  # 응답 모델을 반환하는 기존 경로
+    fast: Callable[[Session], bytes]     # JSON 바이트를 반환하는 빠른 경로
+
+
+PAIRS: List[Pair] = [
+    Pair("statistics", get_statistics, get_statistics_json),
+    Pair(
+        "statistics_week_all",
+        lambda session: get_statistics(session, period_type="week", payment_type="all"),
+        lambda session: get_statistics_json(session, period_type="week", payment_type="all"),
+    ),
+    Pair("daily_sales_statistics", get_daily_sales_statistics, get_daily_sales_statistics_json),
+    Pair(
+        "sales_page",
+        lambda session: get_sales(session, page=1, page_size=100),
+        lambda session: get_sales_json(session, page=1, page_size=100),
+    ),
+]
+
+
+class Columnar(NamedTuple):
+    name: str
+    run: Callable[[Session, bool], bytes]  # (세션, columnar 여부) -> JSON 바이트
+
+
+COLUMNAR: List[Columnar] = [
+    Columnar("statistics", lambda session, columnar: get_statistics_json(session, columnar=columnar)),
+    Columnar(
+        "daily_sales_statistics",
+        lambda session, columnar: get_daily_sales_statistics_json(session, columnar=columnar),
+    ),
+    Columnar("sale_by_month", lambda session, columnar: get_sale_by_month_json(session, "2010-06", columnar)),
+]
+
+
+def encode_models(value: object) -> bytes:
+    # 기존 라우터의 직렬화 (FastAPI 기본 인코더)
+    return json.dumps(
+        jsonable_encoder(value),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _median_ms(engine, run: Callable[[Session], bytes], repeat: int) -> float:
+    timings: List[float] = []
+    for _ in range(repeat):
+        with Session(engine) as session:
+            started = time.perf_counter()
+            run(session)
+            timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare model-based and direct JSON response serialization")
+    parser.add_argument("--size", choices=sorted(SIZES), default="1m", help="Size preset")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the generated data")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per path")
+    args = parser.parse_args()
+
+    path = ensure_database(args.size, args.seed)
+    engine = create_app_engine(f"sqlite:///{path}")
+
+    # 통계 조회 대상이 있도록 비어 있으면 먼저 재계산
+    with Session(engine) as session:
+        if not session.exec(select(func.count()).select_from(SaleStatistics)).one():
+            recompute_statistics(session)
+
+    failed = False
+    for pair in PAIRS:
+        with Session(engine) as session:
+            expected = encode_models(pair.models(session))
+            actual = pair.fast(session)
+        rows = len(json.loads(expected)) if expected.startswith(b"[") else len(json.loads(expected)["data"])
+        same = expected == actual
+        failed |= not same
+
+        models_ms = _median_ms(engine, lambda session: encode_models(pair.models(session)), args.repeat)
+        fast_ms = _median_ms(engine, pair.fast, args.repeat)
+        print(
+            f"{pair.name}: {rows} rows, {len(actual) / 1024:.0f}KB, "
+            f"models {models_ms:.1f}ms, fast {fast_ms:.1f}ms ({models_ms / fast_ms:.1f}x)"
+            f"{'' if same else ' [BODY DIFFERS]'}"
+        )
+
+    for case in COLUMNAR:
+        with Session(engine) as session:
+            rows_size = len(case.run(session, False))
+            columnar_size = len(case.run(session, True))
+        rows_ms = _median_ms(engine, lambda session: case.run(session, False), args.repeat)
+        columnar_ms = _median_ms(engine, lambda session: case.run(session, True), args.repeat)
+        print(
+            f"{case.name} columnar: {rows_size / 1024:.0f}KB -> {columnar_size / 1024:.0f}KB "
+            f"({columnar_size / rows_size:.0%}), rows {rows_ms:.1f}ms, columnar {columnar_ms:.1f}ms"
+        )
+    engine.dispose()
+
+    if failed:
+        raise SystemExit("Fast-path response bodies differ from the model-based ones")
+
+
+if __name__ == "__main__":
+    main()
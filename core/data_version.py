@@ -0,0 +1,42 @@
+"""
+데이터 버전 (DB의 data_version 단일 행)
+
+판매/날씨/통계 쓰기 경로가 커밋 전에 같은 트랜잭션에서 버전을 올리면,
+버전을 키에 포함하는 응답 캐시는 자동으로 무효화된다.
+버전이 DB에 있으므로 여러 워커 프로세스와 스크립트의 쓰기도 모든 프로세스의 캐시를 무효화한다.
+(SQL로 직접 데이터를 고치는 경우 DATA_VERSION_BUMP_SQL을 같은 트랜잭션에서 실행)
+"""
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.db import upsert_insert
+from models.data_version import DataVersion
+
+# sqlite3 등 ORM 밖의 쓰기용
+DATA_VERSION_BUMP_SQL = (
+    "INSERT INTO data_version (id, version) VALUES (1, 1) "
+    "ON CONFLICT (id) DO UPDATE SET version = version + 1"
+)
+
+
+def get_data_version(session: Session, for_update: bool = False) -> int:
+    """
+    현재 데이터 버전 (for_update이면 트랜잭션이 끝날 때까지 행 잠금, SQLite는 BEGIN IMMEDIATE로 대신함)
+    """
+    query = select(DataVersion.version).where(DataVersion.id == 1)
+    if for_update:
+        query = query.with_for_update()
+    return session.exec(query).first() or 0
+
+
+def bump_data_version(session: Session) -> None:
+    """
+    현재 트랜잭션에서 데이터 버전 증가 (커밋은 호출자가 데이터 변경과 함께 수행)
+    """
+    table = DataVersion.__table__
+    stmt = upsert_insert(session, table).values(id=1, version=1)
+    session.exec(stmt.on_conflict_do_update(index_elements=["id"], set_={"version": table.c.version + 1}))
+
+
+async def get_data_version_async(session: AsyncSession) -> int:
+    return await session.run_sync(get_data_version)
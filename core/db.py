@@ -3,12 +3,32 @@ from pathlib import Path
 import os
 
 from fastapi import Depends
-from sqlmodel import create_engine, Session
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.engine import async_url, create_app_engine, create_async_app_engine, is_memory_sqlite
 
 default_db_path = Path(__file__).resolve().parent.parent / "sales.db"
 DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{default_db_path}")
+# 조회 전용 DB (미지정 시 같은 DB를 별도 연결 풀로 사용)
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL", DATABASE_URL)
+# SQL 로그 출력 (디버깅용, 기본 꺼짐)
+DATABASE_ECHO = os.getenv("DATABASE_ECHO", "").lower() in ("1", "true", "yes")
+
+engine = create_app_engine(DATABASE_URL, echo=DATABASE_ECHO)
 
-engine = create_engine(DATABASE_URL, echo=True)
+# 비동기 엔진 (API 요청용, SQLite는 aiosqlite). 동기 엔진은 스크립트와 백그라운드 작업용
+async_engine = create_async_app_engine(os.getenv("ASYNC_DATABASE_URL", async_url(DATABASE_URL)), echo=DATABASE_ECHO)
+
+# 메모리 DB는 연결마다 다른 DB가 되므로 쓰기 엔진을 함께 사용
+if READ_DATABASE_URL == DATABASE_URL and is_memory_sqlite(DATABASE_URL):
+    read_engine = engine
+    async_read_engine = async_engine
+else:
+    read_engine = create_app_engine(READ_DATABASE_URL, read_only=True, echo=DATABASE_ECHO)
+    async_read_engine = create_async_app_engine(
+        os.getenv("ASYNC_READ_DATABASE_URL", async_url(READ_DATABASE_URL)), read_only=True, echo=DATABASE_ECHO
+    )
 
 
 def get_session():
@@ -16,4 +36,37 @@ def get_session():
         yield session
 
 
+def get_read_session():
+    with Session(read_engine) as session:
+        yield session
+
+
+# 커밋 후에도 응답 직렬화 시 지연 로딩(비동기에서는 불가)이 없도록 만료하지 않는다
+async def get_async_session():
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+async def get_async_read_session():
+    async with AsyncSession(async_read_engine, expire_on_commit=False) as session:
+        yield session
+
+
 SessionDep = Annotated[Session, Depends(get_session)]
+# 조회(GET) 전용 세션: 쓰기 트랜잭션과 경합하지 않는 읽기 전용 연결
+ReadSessionDep = Annotated[Session, Depends(get_read_session)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session)]
+AsyncReadSessionDep = Annotated[AsyncSession, Depends(get_async_read_session)]
+
+
+def upsert_insert(session: Session, table):
+    """
+    현재 DB 방언의 INSERT ... ON CONFLICT 구문 생성
+
+    on_conflict_do_update/on_conflict_do_nothing을 지원하는 insert를 반환한다.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
@@ -0,0 +1,139 @@
+"""
+DB 엔진 프로필
+
+SQLite는 연결마다 PRAGMA를 적용한다. (환경 변수로 조정)
+- 쓰기 엔진: WAL 저널, synchronous=NORMAL, busy timeout, 캐시/mmap 크기
+- 읽기 전용 엔진: 같은 파일의 별도 연결 풀 + query_only
+  WAL에서는 읽기가 쓰기(예: 통계 재계산)를 기다리지 않는다.
+
+비동기 엔진(create_async_app_engine)도 같은 프로필을 사용한다. (SQLite는 aiosqlite)
+"""
+import os
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import create_engine
+
+from core.metrics import CountingConnection, install_sql_hooks
+
+
+class SqliteProfile(NamedTuple):
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    busy_timeout_ms: int = 5000
+    cache_size_kib: int = 64 * 1024
+    mmap_size: int = 256 * 1024 * 1024
+
+    @classmethod
+    def from_env(cls) -> "SqliteProfile":
+        default = cls()
+        return cls(
+            journal_mode=os.getenv("SQLITE_JOURNAL_MODE", default.journal_mode),
+            synchronous=os.getenv("SQLITE_SYNCHRONOUS", default.synchronous),
+            busy_timeout_ms=int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", default.busy_timeout_ms)),
+            cache_size_kib=int(os.getenv("SQLITE_CACHE_SIZE_KIB", default.cache_size_kib)),
+            mmap_size=int(os.getenv("SQLITE_MMAP_SIZE", default.mmap_size)),
+        )
+
+
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def is_memory_sqlite(url: str) -> bool:
+    return is_sqlite(url) and make_url(url).database in (None, "", ":memory:")
+
+
+# 드라이버를 지정하지 않은 URL의 비동기 드라이버
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+
+def async_url(url: str) -> str:
+    """
+    동기 DB URL을 비동기 드라이버 URL로 변환 (예: sqlite:///a.db -> sqlite+aiosqlite:///a.db)
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if parsed.drivername != backend or backend not in ASYNC_DRIVERS:
+        return url
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def sqlite_pragmas(profile: SqliteProfile, read_only: bool = False) -> List[str]:
+    pragmas = [
+        f"PRAGMA busy_timeout = {profile.busy_timeout_ms}",
+        # 음수는 KiB 단위
+        f"PRAGMA cache_size = -{profile.cache_size_kib}",
+        f"PRAGMA mmap_size = {profile.mmap_size}",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")
+    else:
+        # 저널 모드는 DB 파일에 저장되므로 쓰기 엔진에서만 설정
+        pragmas.append(f"PRAGMA journal_mode = {profile.journal_mode}")
+        pragmas.append(f"PRAGMA synchronous = {profile.synchronous}")
+    return pragmas
+
+
+def create_app_engine(
+    url: str,
+    read_only: bool = False,
+    echo: bool = False,
+    profile: Optional[SqliteProfile] = None,
+) -> Engine:
+    """
+    프로필을 적용한 엔진 생성 (SQL 지표 수집 포함)
+    """
+    if not is_sqlite(url):
+        engine = create_engine(url, echo=echo)
+        install_sql_hooks(engine)
+        return engine
+
+    # SQLite는 조회 행 수를 세는 연결/커서 사용
+    engine = create_engine(url, echo=echo, connect_args={"factory": CountingConnection})
+    _install_pragmas(engine, sqlite_pragmas(profile or SqliteProfile.from_env(), read_only))
+    install_sql_hooks(engine)
+    return engine
+
+
+def create_async_app_engine(
+    url: str,
+    read_only: bool = False,
+    echo: bool = False,
+    profile: Optional[SqliteProfile] = None,
+) -> AsyncEngine:
+    """
+    프로필을 적용한 비동기 엔진 생성 (url은 동기/비동기 URL 모두 가능)
+    """
+    engine = create_async_engine(async_url(url), echo=echo)
+    if is_sqlite(url):
+        _install_pragmas(engine.sync_engine, sqlite_pragmas(profile or SqliteProfile.from_env(), read_only))
+        install_sql_hooks(engine.sync_engine, count_buffered_rows=True)
+    else:
+        install_sql_hooks(engine.sync_engine)
+    return engine
+
+
+def begin_immediate(connection: Connection) -> None:
+    """
+    SQLite 쓰기 트랜잭션을 바로 시작 (쓰기 잠금 획득)
+
+    pysqlite는 DML 앞에서만 BEGIN을 내므로, 읽고 확인한 뒤 쓰는 작업이나 DDL을
+    한 트랜잭션으로 묶으려면 직접 시작해야 한다. (SQLite가 아니면 아무것도 하지 않음)
+    """
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def _install_pragmas(engine: Engine, pragmas: List[str]) -> None:
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
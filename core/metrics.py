@@ -0,0 +1,278 @@
+"""
+요청/DB/KMA 성능 지표 (Prometheus 텍스트 형식)
+
+- MetricsMiddleware: 경로(route 템플릿)별 요청 지연 시간과 요청 수
+- install_sql_hooks: SQL 실행 수, DB 시간, 조회 행 수를 현재 요청의 경로에 기록
+- kma_timer: KMA 호출 시간
+
+요청 밖(백그라운드 작업, 스크립트)에서 실행된 SQL은 route="<background>"로 기록된다. (프로세스 단위)
+"""
+import logging
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+BACKGROUND_ROUTE = "<background>"
+UNMATCHED_ROUTE = "<unmatched>"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+logger = logging.getLogger(__name__)
+
+
+def _labels(**labels: str) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in items) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = _labels(**labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float]) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        # labels -> (버킷별 개수, 합계, 전체 개수)
+        self._values: Dict[Labels, Tuple[List[int], float, int]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _labels(**labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            if index < len(counts):
+                counts[index] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{_format_labels(labels, ('le', f'{bound:g}'))} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(labels, ('le', '+Inf'))} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {total:g}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", LATENCY_BUCKETS
+)
+REQUESTS = Counter("http_requests_total", "HTTP requests by route and status")
+DB_STATEMENTS = Counter("db_statements_total", "SQL statements executed by route")
+DB_TIME = Counter("db_time_seconds_total", "Time spent executing SQL by route")
+DB_ROWS = Counter("db_rows_fetched_total", "Rows fetched from the database by route (SQLite only)")
+REQUEST_STATEMENTS = Histogram(
+    "db_statements_per_request", "SQL statements per HTTP request by route", STATEMENT_BUCKETS
+)
+KMA_DURATION = Histogram("kma_request_duration_seconds", "KMA API call latency by status", LATENCY_BUCKETS)
+
+METRICS = (REQUEST_DURATION, REQUESTS, DB_STATEMENTS, DB_TIME, DB_ROWS, REQUEST_STATEMENTS, KMA_DURATION)
+
+
+class RequestStats:
+    """
+    요청 하나의 DB 사용량 (요청 처리 스레드가 함께 갱신)
+    """
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.db_time = 0.0
+        self.rows = 0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    경로별 요청 지연 시간/상태와 요청당 SQL 사용량 기록 (ASGI 미들웨어)
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current.reset(token)
+            # 라우터가 매칭한 경로 템플릿 (예: /sale/{sale_id})
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            REQUEST_DURATION.observe(elapsed, method=method, route=route)
+            REQUESTS.inc(method=method, route=route, status=status["code"])
+            REQUEST_STATEMENTS.observe(stats.statements, method=method, route=route)
+            if stats.statements:
+                DB_STATEMENTS.inc(stats.statements, method=method, route=route)
+                DB_TIME.inc(stats.db_time, method=method, route=route)
+            if stats.rows:
+                DB_ROWS.inc(stats.rows, method=method, route=route)
+
+
+def _record_rows(count: int) -> None:
+    if not count:
+        return
+    stats = _current.get()
+    if stats is None:
+        DB_ROWS.inc(count, method="", route=BACKGROUND_ROUTE)
+    else:
+        stats.rows += count
+
+
+class CountingCursor(sqlite3.Cursor):
+    """
+    fetch 호출마다 가져온 행 수를 기록하는 SQLite 커서
+    """
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            _record_rows(1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = super().fetchmany(*args, **kwargs)
+        _record_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        _record_rows(len(rows))
+        return rows
+
+
+class CountingConnection(sqlite3.Connection):
+    """
+    create_engine(connect_args={"factory": CountingConnection})로 지정하는 SQLite 연결
+    """
+
+    def cursor(self, factory=CountingCursor):
+        return super().cursor(factory)
+
+
+# SQLAlchemy aiosqlite 어댑터 커서(AsyncAdapt_aiosqlite_cursor)가 실행 시 결과 행을 담아 두는 속성.
+# 공개 API로는 행 수를 알 수 없어(SELECT의 rowcount는 -1) 내부 구현에 의존하므로 requirements.txt의
+# SQLAlchemy 버전에 고정하며, 버전을 올리면 scripts/check_metrics_rows.py로 행 수가 기록되는지 확인한다.
+BUFFERED_ROWS_ATTRIBUTE = "_rows"
+
+
+def buffered_rows_supported() -> bool:
+    """
+    설치된 SQLAlchemy의 aiosqlite 어댑터 커서에 BUFFERED_ROWS_ATTRIBUTE가 있는지
+    """
+    try:
+        from sqlalchemy.dialects.sqlite.aiosqlite import AsyncAdapt_aiosqlite_cursor
+    except ImportError:
+        return False
+    return BUFFERED_ROWS_ATTRIBUTE in getattr(AsyncAdapt_aiosqlite_cursor, "__slots__", ())
+
+
+def install_sql_hooks(engine: Engine, count_buffered_rows: bool = False) -> None:
+    """
+    엔진의 SQL 실행 수와 실행 시간을 현재 요청(없으면 <background>)에 기록
+
+    count_buffered_rows: 실행 시 결과를 모두 버퍼링하는 드라이버 어댑터(aiosqlite)의 행 수 기록.
+        aiosqlite는 별도 스레드에서 fetch하므로 CountingCursor로는 요청에 연결할 수 없다.
+        어댑터 커서의 버퍼 속성이 없으면(SQLAlchemy 내부 구현 변경) 0으로 기록하지 않고 경고 후 행 수 기록을 끈다.
+    """
+    if count_buffered_rows and not buffered_rows_supported():
+        logger.warning(
+            "SQLAlchemy aiosqlite cursor has no %r attribute; db_rows_fetched_total is not recorded "
+            "for async queries (see scripts/check_metrics_rows.py)",
+            BUFFERED_ROWS_ATTRIBUTE,
+        )
+        count_buffered_rows = False
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        stats = _current.get()
+        if stats is None:
+            DB_STATEMENTS.inc(method="", route=BACKGROUND_ROUTE)
+            DB_TIME.inc(elapsed, method="", route=BACKGROUND_ROUTE)
+        else:
+            stats.statements += 1
+            stats.db_time += elapsed
+        if count_buffered_rows:
+            _record_rows(len(getattr(cursor, BUFFERED_ROWS_ATTRIBUTE)))
+
+
+@contextmanager
+def kma_timer() -> Iterator[dict]:
+    """
+    KMA 호출 시간 기록 (응답을 받으면 call["status"]에 상태 코드를 넣는다)
+    """
+    call = {"status": "error"}
+    started = time.perf_counter()
+    try:
+        yield call
+    finally:
+        KMA_DURATION.observe(time.perf_counter() - started, status=call["status"])
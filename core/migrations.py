@@ -0,0 +1,245 @@
+"""
+버전 기반 스키마 마이그레이션
+
+schema_migrations 테이블에 적용된 버전을 기록하고,
+아직 적용되지 않은 마이그레이션만 버전 순서대로 하나의 트랜잭션씩 실행한다.
+(실패하면 해당 버전의 변경은 모두 롤백되고 다음 시작 시 다시 실행된다)
+
+    python -m core.migrations
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Connection, Engine, text
+
+from core.data_version import DATA_VERSION_BUMP_SQL
+from core.engine import begin_immediate
+from utils.calendar import day_key, day_key_sql, day_str, month_bounds, week_bounds
+
+logger = logging.getLogger(__name__)
+
+
+def _dedupe_sales(conn: Connection) -> None:
+    """
+    유니크 제약을 걸기 전에 중복 판매 데이터 병합
+
+    (input_date, payment_type)마다 가장 최근(id가 가장 큰) 행에 금액을 합산하고 나머지 행을 지운다.
+    매출 합계는 그대로이고 거래 건수만 줄어들므로, 저장된 주/월 통계의 건수/평균을 같은 트랜잭션에서
+    맞추고 데이터 버전을 올린다. (통계가 전체 재계산 결과와 같게 유지되고 응답 캐시도 무효화된다)
+    """
+    duplicates = conn.execute(
+        text(
+            """
+            SELECT input_date, payment_type, MAX(id), GROUP_CONCAT(id), SUM(amount), COUNT(*)
+            FROM sale
+            GROUP BY input_date, payment_type
+            HAVING COUNT(*) > 1
+            """
+        )
+    ).all()
+    if not duplicates:
+        return
+
+    for input_date, payment_type, kept_id, ids, amount, _ in duplicates:
+        merged = sorted(int(sale_id) for sale_id in ids.split(",") if int(sale_id) != kept_id)
+        logger.warning(
+            "Merged duplicated sale %s/%s into id %s (amount %s, merged ids %s)",
+            input_date, payment_type, kept_id, amount, merged,
+        )
+    conn.execute(
+        text("UPDATE sale SET amount = :amount WHERE id = :id"),
+        [{"id": kept_id, "amount": amount} for _, _, kept_id, _, amount, _ in duplicates],
+    )
+    conn.execute(
+        text(
+            """
+            DELETE FROM sale
+            WHERE id NOT IN (SELECT MAX(id) FROM sale GROUP BY input_date, payment_type)
+            """
+        )
+    )
+
+    # 병합된 행 수만큼 해당 주/월의 결제 타입별/전체 통계 건수를 줄인다
+    adjustments = []
+    for input_date, payment_type, _, _, _, count in duplicates:
+        day = day_key(input_date)
+        for period_type, period_start in (("week", week_bounds(day)[0]), ("month", month_bounds(day)[0])):
+            adjustments.append({
+                "period_type": period_type,
+                "period_start": day_str(period_start),
+                "payment_type": payment_type,
+                "merged": count - 1,
+            })
+    conn.execute(
+        text(
+            """
+            UPDATE sale_statistics
+            SET transaction_count = transaction_count - :merged,
+                avg_amount = CAST(total_amount AS REAL) / (transaction_count - :merged)
+            WHERE period_type = :period_type AND period_start = :period_start
+              AND payment_type IN (:payment_type, 'all') AND transaction_count > :merged
+            """
+        ),
+        adjustments,
+    )
+
+    # 실행 중인 앱의 응답 캐시 무효화 (data_version 테이블이 없으면 캐시를 쓰는 앱이 실행된 적 없는 DB)
+    if conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'data_version'")).first():
+        conn.execute(text(DATA_VERSION_BUMP_SQL))
+    logger.warning("Merged duplicated sales for %d keys", len(duplicates))
+
+
+def _add_query_indexes(conn: Connection) -> None:
+    _dedupe_sales(conn)
+
+    # update_sale/delete_sale 조회 및 upsert 키
+    conn.execute(
+        text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_sale_input_date_payment_type "
+            "ON sale (input_date, payment_type)"
+        )
+    )
+    # create_weather의 미동기화 판매 조회
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_sale_sync_status_input_date "
+            "ON sale (sync_status, input_date)"
+        )
+    )
+    # get_statistics 필터/정렬
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_sale_statistics_period "
+            "ON sale_statistics (period_type, payment_type, period_start)"
+        )
+    )
+
+
+# (테이블, 생성 열, 원본 날짜 열, 인덱스 이름, 인덱스 열)
+DAY_KEY_COLUMNS = [
+    ("sale", "input_day", "input_date", "ix_sale_input_day", "input_day"),
+    ("sale_daily", "input_day", "input_date", "ix_sale_daily_input_day", "input_day"),
+    ("weather", "day", "date", "ix_weather_day", "day"),
+    ("sale_statistics", "period_start_day", "period_start", "ix_sale_statistics_period_day",
+     "period_type, payment_type, period_start_day"),
+    ("sale_statistics", "period_end_day", "period_end", None, None),
+]
+
+
+def _add_day_key_columns(conn: Connection) -> None:
+    # 날짜 문자열 옆에 일 번호 생성 열 추가 (VIRTUAL이므로 기존 행을 다시 쓰지 않음)
+    for table, column, source, index, index_columns in DAY_KEY_COLUMNS:
+        existing = {row[1] for row in conn.execute(text(f"PRAGMA table_xinfo({table})"))}
+        if column not in existing:
+            conn.execute(
+                text(
+                    f"ALTER TABLE {table} ADD COLUMN {column} INTEGER "
+                    f"GENERATED ALWAYS AS ({day_key_sql(source)}) VIRTUAL"
+                )
+            )
+        if index:
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index} ON {table} ({index_columns})"))
+    # period_start 문자열 인덱스는 ix_sale_statistics_period_day로 대체
+    conn.execute(text("DROP INDEX IF EXISTS ix_sale_statistics_period"))
+
+
+def backfill_sale_daily(conn: Connection) -> int:
+    """
+    일별 롤업(sale_daily) 전체를 sale 테이블 기준으로 다시 작성
+
+    롤업 도입 전 DB는 sale_daily가 비어 있어 판매 목록/일별 통계가 비어 보이므로 마이그레이션으로 채운다.
+    (scripts/backfill_sale_daily.py로 수동 재작성도 가능)
+
+    Returns:
+        작성된 롤업 행 수
+    """
+    conn.execute(text("DELETE FROM sale_daily"))
+    return conn.execute(
+        text(
+            """
+            INSERT INTO sale_daily (input_date, payment_type, total_amount, transaction_count)
+            SELECT input_date, payment_type, SUM(amount), COUNT(*)
+            FROM sale
+            GROUP BY input_date, payment_type
+            """
+        )
+    ).rowcount
+
+
+# (버전, 이름, 적용 함수) - 버전은 증가하는 순서로만 추가
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "add_query_indexes", _add_query_indexes),
+    (2, "add_day_key_columns", _add_day_key_columns),
+    (3, "backfill_sale_daily", backfill_sale_daily),
+]
+
+
+def _applied_versions(conn: Connection) -> set:
+    conn.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER NOT NULL PRIMARY KEY,
+                name VARCHAR NOT NULL,
+                applied_at VARCHAR NOT NULL
+            )
+            """
+        )
+    )
+    return set(conn.execute(text("SELECT version FROM schema_migrations")).scalars())
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """
+    적용되지 않은 마이그레이션 실행
+
+    Args:
+        engine: 대상 DB 엔진 (테이블은 create_all로 이미 생성되어 있어야 함)
+
+    Returns:
+        이번에 적용된 버전 리스트
+    """
+    with engine.begin() as conn:
+        applied = _applied_versions(conn)
+
+    newly_applied: List[int] = []
+    for version, name, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        with engine.begin() as conn:
+            # DDL(CREATE INDEX, ALTER TABLE)까지 한 트랜잭션으로 묶는다
+            begin_immediate(conn)
+            # 다른 프로세스가 먼저 적용했는지 쓰기 잠금을 잡은 뒤 다시 확인
+            if version in _applied_versions(conn):
+                continue
+            migrate(conn)
+            conn.execute(
+                text(
+                    "INSERT INTO schema_migrations (version, name, applied_at) "
+                    "VALUES (:version, :name, :applied_at)"
+                ),
+                {
+                    "version": version,
+                    "name": name,
+                    "applied_at": datetime.now(timezone.utc).isoformat(),
+                },
+            )
+        newly_applied.append(version)
+
+    return newly_applied
+
+
+if __name__ == "__main__":
+    from sqlmodel import SQLModel
+
+    from core.db import engine
+    import models.data_version  # noqa: F401
+    import models.sale  # noqa: F401
+    import models.sale_daily  # noqa: F401
+    import models.sale_statistics  # noqa: F401
+    import models.weather  # noqa: F401
+
+    SQLModel.metadata.create_all(bind=engine)
+    versions = run_migrations(engine)
+    print(f"Applied migrations: {versions or 'none'}")
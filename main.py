@@ -1,19 +1,35 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from sqlmodel import SQLModel
 from starlette.middleware.cors import CORSMiddleware
 
 from core.db import engine
+from core.metrics import MetricsMiddleware
+from core.migrations import run_migrations
 from dotenv import load_dotenv
 from routers.sale import router as sale_router
 from routers.weather import router as weather_router
 from routers.statistics import router as statistics_router
+from routers.metrics import router as metrics_router
+from routers.export import router as export_router
+from service.sale_statistics import shutdown_recompute_executors
 
 load_dotenv()
 
-# 테이블 생성
+# 테이블 생성 및 스키마 마이그레이션
 SQLModel.metadata.create_all(bind=engine)
+run_migrations(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # 통계 재계산 집계 프로세스 풀 정리
+    shutdown_recompute_executors()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 origins = [
     "http://localhost:5173",
@@ -30,6 +46,11 @@ app.add_middleware(
     allow_headers=["*"],      # Content-Type, Authorization 등
 )
 
+# 경로별 요청 지연 시간/SQL 사용량 (/metrics)
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(sale_router, tags=["sale"])
 app.include_router(weather_router, tags=["weather"])
 app.include_router(statistics_router, tags=["statistics"])
+app.include_router(export_router, tags=["export"])
+app.include_router(metrics_router, tags=["metrics"])
@@ -0,0 +1,12 @@
+from sqlmodel import SQLModel, Field
+
+
+class DataVersion(SQLModel, table=True):
+    """
+    데이터 버전 (id=1 단일 행)
+    판매/날씨/통계를 바꾸는 트랜잭션이 커밋 전에 올리며, 응답 캐시와 ETag의 키로 사용된다
+    """
+    __tablename__ = "data_version"
+
+    id: int = Field(default=1, primary_key=True)
+    version: int = 0
@@ -1,9 +1,24 @@
+import re
 from datetime import datetime
 from typing import Optional, List, Dict
+from pydantic import field_validator
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 
+from utils.calendar import day_key_column
+
+# sync_status 값 (날씨 동기화 상태)
+SYNC_PENDING = 0
+SYNC_DONE = 1
+SYNC_FAILED = 2  # KMA에 해당 날짜 관측값이 없어 재조회하지 않음
+
 class Sale(SQLModel, table=True):
     __tablename__ = "sale"  # 기존 sale 테이블 사용
+    # 기존 DB에는 core/migrations.py가 같은 이름으로 추가
+    __table_args__ = (
+        Index("ux_sale_input_date_payment_type", "input_date", "payment_type", unique=True),
+        Index("ix_sale_sync_status_input_date", "sync_status", "input_date"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True, index=True)
     input_date: str
@@ -12,6 +27,20 @@ class Sale(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     sync_status: int = 0
 
+# 판매 날짜의 일 번호 (기간 조회와 날씨 조인은 문자열 대신 이 열을 사용)
+sale_input_day = day_key_column(Sale.__table__, "input_day", "input_date")
+Index("ix_sale_input_day", sale_input_day)
+
+# 판매 날짜 형식 (일 번호/주·월 구간 계산과 일별 롤업이 같은 문자열을 쓰도록 YYYY-MM-DD만 허용)
+INPUT_DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def validate_input_date(value: str) -> str:
+    if not INPUT_DATE_PATTERN.match(value):
+        raise ValueError("input_date must be YYYY-MM-DD")
+    datetime.strptime(value, "%Y-%m-%d")  # 존재하지 않는 날짜(2024-02-30 등)는 ValueError
+    return value
+
 class SaleCreate(SQLModel):
     input_date: str
     amount: int
@@ -19,12 +48,21 @@ class SaleCreate(SQLModel):
     created_at: datetime = datetime.now()
     sync_status: int = 0
 
+    _check_input_date = field_validator("input_date")(validate_input_date)
+
 class SaleUpdate(SQLModel):
     input_date: str
     amount: int
     payment_type: str
     sync_status: int = 0
 
+    _check_input_date = field_validator("input_date")(validate_input_date)
+
+class SaleBulkResponse(SQLModel):
+    inserted: int
+    updated: int
+    rejected: int
+
 class SaleDelete(SQLModel):
     input_date: str
     payment_type: str
@@ -35,10 +73,11 @@ class DailySaleByPaymentType(SQLModel):
     total_amount: int
 
 class SaleListResponse(SQLModel):
-    total: int
+    total: Optional[int] = None  # cursor 요청에서는 계산하지 않음
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # 다음 페이지 조회용 마지막 날짜
     data: List[DailySaleByPaymentType]
 
 class DailySaleTotal(SQLModel):
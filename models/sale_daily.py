@@ -0,0 +1,23 @@
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+
+from utils.calendar import day_key_column
+
+
+class SaleDaily(SQLModel, table=True):
+    """
+    일별 결제 타입별 판매 집계 테이블
+    sale 테이블의 롤업으로, 판매 생성/수정/삭제 시 함께 갱신된다
+    """
+    __tablename__ = "sale_daily"
+
+    input_date: str = Field(primary_key=True)  # YYYY-MM-DD
+    payment_type: str = Field(primary_key=True)
+
+    total_amount: int = 0  # 총 판매액
+    transaction_count: int = 0  # 거래 건수
+
+
+# 날짜의 일 번호 (기간 조회와 날씨 조인용)
+sale_daily_input_day = day_key_column(SaleDaily.__table__, "input_day", "input_date")
+Index("ix_sale_daily_input_day", sale_daily_input_day)
@@ -1,17 +1,12 @@
 from datetime import datetime, timezone
 from typing import Optional, List, Dict
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 
+from utils.calendar import day_key_column
 
-class SaleStatistics(SQLModel, table=True):
-    """
-    판매 통계 테이블
-    주별, 월별, 결제 타입별 등 다양한 기준으로 집계된 통계 저장
-    """
-    __tablename__ = "sale_statistics"
-
-    id: Optional[int] = Field(default=None, primary_key=True)
 
+class SaleStatisticsBase(SQLModel):
     # 집계 기간 정보
     period_type: str  # 'week', 'month'
     period_start: str  # 시작 날짜 (YYYY-MM-DD)
@@ -30,6 +25,49 @@ class SaleStatistics(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
+class SaleStatistics(SaleStatisticsBase, table=True):
+    """
+    판매 통계 테이블
+    주별, 월별, 결제 타입별 등 다양한 기준으로 집계된 통계 저장
+    """
+    __tablename__ = "sale_statistics"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+
+# 기간 시작/종료일의 일 번호 (기간 필터와 재계산 범위 비교용)
+period_start_day = day_key_column(SaleStatistics.__table__, "period_start_day", "period_start")
+period_end_day = day_key_column(SaleStatistics.__table__, "period_end_day", "period_end")
+# get_statistics 필터/정렬 (기존 DB에는 core/migrations.py가 추가)
+Index(
+    "ix_sale_statistics_period_day",
+    SaleStatistics.__table__.c.period_type,
+    SaleStatistics.__table__.c.payment_type,
+    period_start_day,
+)
+
+
+class SaleStatisticsStaging(SaleStatisticsBase, table=True):
+    """
+    통계 재계산용 스테이징 테이블
+    재계산 결과를 먼저 채운 뒤 한 트랜잭션에서 sale_statistics로 교체한다
+    """
+    __tablename__ = "sale_statistics_staging"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+
+class SaleStatisticsDirty(SQLModel, table=True):
+    """
+    통계 재계산이 필요한 판매 날짜
+    판매 생성/수정/삭제 시 기록되고, 변경분 재계산 후 삭제된다
+    """
+    __tablename__ = "sale_statistics_dirty"
+
+    input_date: str = Field(primary_key=True)  # YYYY-MM-DD
+    marked_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
 class SaleStatisticsCreate(SQLModel):
     period_type: str
     period_start: str
@@ -64,6 +102,17 @@ class WeatherMonthlySalesTrend(SQLModel):
     data: List[WeatherMonthlySales]
 
 
+class RecomputeJobResponse(SQLModel):
+    """통계 재계산 작업 상태"""
+    job_id: str
+    scope: str  # 'all', 'dirty', 'YYYY-MM-DD~YYYY-MM-DD'
+    status: str  # 'pending', 'running', 'done', 'failed'
+    progress: float  # 0.0 ~ 1.0
+    detail: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
 class DailySalesByPaymentType(SQLModel):
     date: str
     payment_types: Dict[str, int]
@@ -1,5 +1,8 @@
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 
+from utils.calendar import day_key_column
+
 class Weather(SQLModel, table=True):
     __tablename__ = "weather"
 
@@ -12,6 +15,10 @@ class Weather(SQLModel, table=True):
     one_hour_rain: float = Field(nullable=False)
     summary: str = Field(nullable=False)
 
+# 관측 날짜의 일 번호 (date는 YYYYMMDD 또는 YYYY-MM-DD로 저장되어 있어 조인/조회는 이 열을 사용)
+weather_day = day_key_column(Weather.__table__, "day", "date")
+Index("ix_weather_day", weather_day)
+
 class WeatherCreate(SQLModel):
     date: str
     avg_temp: float
@@ -21,3 +28,8 @@ class WeatherCreate(SQLModel):
     avg_humidity: float
     one_hour_rain: float
 
+
+class WeatherBackfillResponse(SQLModel):
+    ranges: int  # 조회한 날짜 범위 수
+    fetched: int  # KMA에서 받은 일자 수
+    stored: int  # 저장(갱신 포함)한 일자 수
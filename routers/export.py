@@ -0,0 +1,51 @@
+from typing import Optional
+
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+
+from service.sale import export_sales
+from service.sale_statistics import export_statistics
+from utils.export import EXPORT_CSV, EXPORT_FORMAT_PATTERN, EXPORT_MEDIA_TYPES
+
+router = APIRouter()
+
+
+def _export_response(body, name: str, export_format: str) -> StreamingResponse:
+    extension = "csv" if export_format == EXPORT_CSV else "ndjson"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{extension}"'},
+    )
+
+
+@router.get("/export/sales")
+async def export_sales_point(
+    start_date: Optional[str] = Query(None, description="시작 날짜 (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="종료 날짜 (YYYY-MM-DD)"),
+    payment_type: Optional[str] = Query(None, description="결제 타입"),
+    format: str = Query(EXPORT_CSV, pattern=EXPORT_FORMAT_PATTERN, description="파일 형식 (csv/ndjson)"),
+) -> StreamingResponse:
+    """
+    판매 데이터 내보내기 (스트리밍)
+
+    페이지 단위 조회 대신 전체 기간을 한 번의 조회로 청크 단위로 내려준다.
+    CSV는 /sale/bulk에 그대로 다시 입력할 수 있다.
+    """
+    return _export_response(export_sales(start_date, end_date, payment_type, format), "sales", format)
+
+
+@router.get("/export/statistics")
+async def export_statistics_point(
+    period_type: Optional[str] = Query(None, description="기간 타입 (week/month)"),
+    payment_type: Optional[str] = Query(None, description="결제 타입 (all/etc/...)"),
+    start_date: Optional[str] = Query(None, description="시작 날짜 (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="종료 날짜 (YYYY-MM-DD)"),
+    format: str = Query(EXPORT_CSV, pattern=EXPORT_FORMAT_PATTERN, description="파일 형식 (csv/ndjson)"),
+) -> StreamingResponse:
+    """
+    판매 통계 내보내기 (스트리밍, 조건은 GET /statistics와 같음)
+    """
+    return _export_response(
+        export_statistics(period_type, payment_type, start_date, end_date, format), "statistics", format
+    )
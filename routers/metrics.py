@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Response
+
+from core.metrics import render_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics_point() -> Response:
+    """
+    요청/DB/KMA 성능 지표 (Prometheus 텍스트 형식)
+    """
+    return Response(content=render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
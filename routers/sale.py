@@ -1,56 +1,95 @@
-from fastapi import APIRouter, Query
+from typing import Optional
 
-from core.db import SessionDep
-from models.sale import Sale, SaleCreate, SaleUpdate, SaleDelete, SaleListResponse, MonthlySaleResponse
-from service.sale import crate_sale, update_sale, get_sales, get_sale, delete_sale, get_sale_by_month
+from fastapi import APIRouter, Query, Request, Response, HTTPException
+
+from core.db import AsyncReadSessionDep, AsyncSessionDep
+from models.sale import Sale, SaleCreate, SaleUpdate, SaleDelete, SaleListResponse, MonthlySaleResponse, SaleBulkResponse
+from service.sale import (
+    crate_sale_async,
+    update_sale_async,
+    get_sales_json_async,
+    get_sale_async,
+    delete_sale_async,
+    get_sale_by_month_json_async,
+    bulk_upsert_sales,
+)
+from utils.json_response import FORMAT_COLUMNAR, FORMAT_PATTERN, FORMAT_ROWS
+from utils.sale_import import iter_sale_records
 
 router = APIRouter()
 
 
 @router.post("/sale", response_model=Sale)
-def create_sale_point(
-    session: SessionDep,
+async def create_sale_point(
+    session: AsyncSessionDep,
     sale: SaleCreate,
 ) -> Sale:
-    return crate_sale(session, sale)
+    return await crate_sale_async(session, sale)
+
+
+@router.post("/sale/bulk", response_model=SaleBulkResponse)
+async def bulk_create_sale_point(
+    session: AsyncSessionDep,
+    request: Request,
+) -> SaleBulkResponse:
+    """
+    판매 데이터 일괄 입력 (JSON 배열, NDJSON, CSV)
+
+    (input_date, payment_type)이 같으면 금액을 갱신한다.
+    """
+    records = iter_sale_records(request.stream(), request.headers.get("content-type", ""))
+    try:
+        return await bulk_upsert_sales(session, records)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/sale", response_model=SaleListResponse)
-def get_sales_point(
-    session: SessionDep,
+async def get_sales_point(
+    session: AsyncReadSessionDep,
     page: int = Query(1, ge=1, description="페이지 번호"),
-    page_size: int = Query(10, ge=1, le=100, description="페이지당 항목 수")
-) -> SaleListResponse:
-    return get_sales(session, page, page_size)
+    page_size: int = Query(10, ge=1, le=100, description="페이지당 항목 수"),
+    cursor: Optional[str] = Query(None, description="이전 페이지의 next_cursor (YYYY-MM-DD)"),
+) -> Response:
+    # 응답 모델 검증 없이 서비스가 만든 JSON을 그대로 반환 (스키마는 SaleListResponse)
+    return Response(
+        content=await get_sales_json_async(session, page, page_size, cursor),
+        media_type="application/json",
+    )
 
 
 @router.get("/sale/{sale_id}", response_model=Sale)
-def get_sale_point(
-    session: SessionDep,
+async def get_sale_point(
+    session: AsyncReadSessionDep,
     sale_id: int,
 ) -> Sale:
-    return get_sale(session, sale_id)
+    return await get_sale_async(session, sale_id)
 
 
 @router.get("/sale/month/", response_model=MonthlySaleResponse)
-def get_sale_by_month_point(
-    session: SessionDep,
+async def get_sale_by_month_point(
+    session: AsyncReadSessionDep,
     key: str,
-) -> MonthlySaleResponse:
-    return get_sale_by_month(session, key)
+    format: str = Query(FORMAT_ROWS, pattern=FORMAT_PATTERN, description="응답 형식 (rows/columnar)"),
+) -> Response:
+    # columnar이면 {"date": [...], "total_amount": [...]} (스키마는 MonthlySaleResponse와 다름)
+    return Response(
+        content=await get_sale_by_month_json_async(session, key, format == FORMAT_COLUMNAR),
+        media_type="application/json",
+    )
 
 
 @router.patch("/sale", response_model=Sale)
-def update_sale_point(
-    session: SessionDep,
+async def update_sale_point(
+    session: AsyncSessionDep,
     sale: SaleUpdate,
 ) -> Sale:
-    return update_sale(session, sale)
+    return await update_sale_async(session, sale)
 
 
 @router.delete("/sale", response_model=Sale)
-def delete_sale_point(
-    session: SessionDep,
+async def delete_sale_point(
+    session: AsyncSessionDep,
     sale: SaleDelete,
 ) -> Sale:
-    return delete_sale(session, sale)
+    return await delete_sale_async(session, sale)
@@ -1,76 +1,120 @@
-from fastapi import APIRouter, Query
+from datetime import date
+from typing import Awaitable, Callable, Optional
 
-from core.db import SessionDep
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.data_version import get_data_version_async
+from core.db import AsyncReadSessionDep
 from models.sale_statistics import (
     SaleStatisticsResponse,
     WeatherMonthlySalesTrend,
     DailySalesByPaymentType,
+    RecomputeJobResponse,
 )
+from service.recompute_jobs import recompute_jobs
 from service.sale_statistics import (
-    get_statistics,
-    get_statistics_summary,
-    get_weather_monthly_sales_trend,
-    recompute_statistics,
-    get_daily_sales_statistics,
+    get_statistics_json_async,
+    get_statistics_summary_json_async,
+    get_weather_monthly_sales_trend_json_async,
+    get_daily_sales_statistics_json_async,
 )
 from typing import List, Optional
+from utils.json_response import FORMAT_COLUMNAR, FORMAT_PATTERN, FORMAT_ROWS
+from utils.response_cache import ResponseCache, etag_matches
 
 router = APIRouter()
 
+# 대시보드 폴링용 조회 응답 캐시 (쓰기 발생 시 데이터 버전으로 무효화)
+statistics_cache = ResponseCache(max_entries=256)
+
+
+async def _cached_response(
+    request: Request,
+    session: AsyncSession,
+    producer: Callable[[], Awaitable[bytes]],
+) -> Response:
+    """
+    엔드포인트 + 쿼리 파라미터 기준으로 캐시된 JSON 응답 반환
+
+    producer는 응답 본문(JSON 바이트)을 만든다. (서비스의 *_json 함수, 응답 모델 검증 없음)
+    캐시는 DB의 데이터 버전이 바뀌면 무효화된다. (같은 세션에서 읽으므로 본문과 같은 시점의 버전)
+    If-None-Match가 현재 ETag와 같으면 본문 없이 304를 반환한다.
+    """
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+    version = await get_data_version_async(session)
+    entry = statistics_cache.get(key, version)
+    if entry is None:
+        entry = statistics_cache.put(key, version, await producer())
+
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
 
 @router.get("/statistics", response_model=List[SaleStatisticsResponse])
-def get_statistics_point(
-    session: SessionDep,
+async def get_statistics_point(
+    session: AsyncReadSessionDep,
+    request: Request,
     period_type: Optional[str] = Query(None, description="기간 타입 (week/month)"),
     payment_type: Optional[str] = Query(None, description="결제 타입 (all/etc/...)"),
     start_date: Optional[str] = Query(None, description="조회 시작 날짜 (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="조회 종료 날짜 (YYYY-MM-DD)"),
-) -> List[SaleStatisticsResponse]:
+    format: str = Query(FORMAT_ROWS, pattern=FORMAT_PATTERN, description="응답 형식 (rows/columnar)"),
+) -> Response:
     """
     판매 통계 조회
 
     - period_type: 'week' (주별) 또는 'month' (월별)
     - payment_type: 'all' (전체) 또는 특정 결제 타입
     - start_date, end_date: 날짜 범위 필터
+    - format: 'columnar'이면 필드별 배열 (payment_type은 payment_types 목록의 인덱스)
 
     여러 조건을 조합하여 조회 가능
     """
-    return get_statistics(
+    return await _cached_response(request, session, lambda: get_statistics_json_async(
         session=session,
         period_type=period_type,
         payment_type=payment_type,
         start_date=start_date,
-        end_date=end_date
-    )
+        end_date=end_date,
+        columnar=format == FORMAT_COLUMNAR,
+    ))
 
 
 @router.get("/statistics/summary/{period_type}", response_model=List[SaleStatisticsResponse])
-def get_statistics_summary_point(
-    session: SessionDep,
+async def get_statistics_summary_point(
+    session: AsyncReadSessionDep,
+    request: Request,
     period_type: str,
     payment_type: str = Query("all", description="결제 타입"),
-) -> List[SaleStatisticsResponse]:
+    format: str = Query(FORMAT_ROWS, pattern=FORMAT_PATTERN, description="응답 형식 (rows/columnar)"),
+) -> Response:
     """
     통계 요약 조회
 
     - period_type: 'week' (주별) 또는 'month' (월별)
     - payment_type: 기본값 'all' (전체)
+    - format: 'columnar'이면 필드별 배열
     """
-    return get_statistics_summary(
+    return await _cached_response(request, session, lambda: get_statistics_summary_json_async(
         session=session,
         period_type=period_type,
-        payment_type=payment_type
-    )
+        payment_type=payment_type,
+        columnar=format == FORMAT_COLUMNAR,
+    ))
 
 
 @router.get("/statistics/weather/monthly", response_model=List[WeatherMonthlySalesTrend])
-def get_weather_monthly_sales_trend_point(
-    session: SessionDep,
+async def get_weather_monthly_sales_trend_point(
+    session: AsyncReadSessionDep,
+    request: Request,
     summary: Optional[str] = Query(None, description="날씨 요약 필터"),
     summary_sky: Optional[str] = Query(None, description="하늘 상태 필터"),
     summary_rain: Optional[str] = Query(None, description="강우 상태 필터"),
     group_by: Optional[str] = Query(None, description="그룹 기준 (sky/rain/both)"),
-) -> List[WeatherMonthlySalesTrend]:
+) -> Response:
     """
     날씨 요약별 월간 매출 추이
 
@@ -79,37 +123,71 @@ def get_weather_monthly_sales_trend_point(
     - summary_rain: 강우 상태 필터 (예: '강우 없음')
     - group_by: 요약 분리 기준 ('sky', 'rain', 'both')
     """
-    return get_weather_monthly_sales_trend(
+    return await _cached_response(request, session, lambda: get_weather_monthly_sales_trend_json_async(
         session=session,
         summary=summary,
         summary_sky=summary_sky,
         summary_rain=summary_rain,
         group_by=group_by,
-    )
+    ))
 
 
 @router.get("/statistics/daily", response_model=List[DailySalesByPaymentType])
-def get_daily_sales_statistics_point(
-    session: SessionDep,
+async def get_daily_sales_statistics_point(
+    session: AsyncReadSessionDep,
+    request: Request,
     start_date: Optional[str] = Query(None, description="조회 시작 날짜 (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="조회 종료 날짜 (YYYY-MM-DD)"),
-) -> List[DailySalesByPaymentType]:
+    format: str = Query(FORMAT_ROWS, pattern=FORMAT_PATTERN, description="응답 형식 (rows/columnar)"),
+) -> Response:
     """
     결제 수단별 일별 매출 통계
+
+    - format: 'columnar'이면 date/total_amount 배열, 결제 타입 목록(payment_types),
+      결제 타입별 금액 배열(amounts, 판매가 없는 날은 null)로 반환
     """
-    return get_daily_sales_statistics(
+    return await _cached_response(request, session, lambda: get_daily_sales_statistics_json_async(
         session=session,
         start_date=start_date,
         end_date=end_date,
-    )
+        columnar=format == FORMAT_COLUMNAR,
+    ))
 
 
-@router.post("/statistics/recompute", response_model=dict)
+@router.post("/statistics/recompute", response_model=RecomputeJobResponse, status_code=202)
 def recompute_statistics_point(
-    session: SessionDep,
-) -> dict:
+    start_date: Optional[date] = Query(None, description="재계산 시작 날짜 (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="재계산 종료 날짜 (YYYY-MM-DD)"),
+    dirty: bool = Query(False, description="변경 기록이 있는 기간만 재계산"),
+) -> RecomputeJobResponse:
     """
     통계 데이터 재계산 요청
+
+    - start_date, end_date: 범위와 겹치는 주/월만 재계산 (미지정 시 전체)
+    - dirty: 판매 변경이 기록된 기간만 재계산 (주기 작업용)
+
+    백그라운드 작업으로 실행되며 작업 ID를 바로 반환한다.
+    같은 범위의 작업이 진행 중이면 해당 작업을 반환한다.
+    """
+    if (start_date is None) != (end_date is None):
+        raise HTTPException(status_code=400, detail="start_date and end_date must be given together")
+    if start_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    return recompute_jobs.submit(
+        start_date=start_date.isoformat() if start_date else None,
+        end_date=end_date.isoformat() if end_date else None,
+        dirty=dirty,
+    )
+
+
+@router.get("/statistics/recompute/{job_id}", response_model=RecomputeJobResponse)
+def get_recompute_job_point(
+    job_id: str,
+) -> RecomputeJobResponse:
+    """
+    통계 재계산 작업 상태 조회
     """
-    recompute_statistics(session=session)
-    return {"status": "ok"}
+    job = recompute_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -1,25 +1,50 @@
+from datetime import date
+
 from fastapi import APIRouter, Query, HTTPException
 
-from core.db import SessionDep
-from models.weather import Weather
-from service.weather import create_weather, read_weathers_by_month
+from core.db import AsyncReadSessionDep, AsyncSessionDep
+from models.weather import Weather, WeatherBackfillResponse
+from service.weather import create_weather_async, read_weathers_by_month_async
+from service.weather_backfill import backfill_weather, DEFAULT_CONCURRENCY
+from utils.weather_cache import WeatherCacheMiss
 from typing import List, Optional
 
 router = APIRouter()
 
 
 @router.post("/weather", response_model=List[Weather])
-def create_weather_point(
-    session: SessionDep,
+async def create_weather_point(
+    session: AsyncSessionDep,
 ) -> List[Weather]:
-    return create_weather(session)
+    try:
+        return await create_weather_async(session)
+    except WeatherCacheMiss as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.post("/weather/backfill", response_model=WeatherBackfillResponse)
+async def backfill_weather_point(
+    session: AsyncSessionDep,
+    start_date: Optional[date] = Query(None, description="대상 판매 시작 날짜 (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="대상 판매 종료 날짜 (YYYY-MM-DD)"),
+    concurrency: int = Query(DEFAULT_CONCURRENCY, ge=1, le=16, description="동시 요청 수"),
+) -> WeatherBackfillResponse:
+    """
+    KMA 날씨 백필
+
+    날씨가 없는 미동기화 판매 날짜만 연속 구간으로 묶어 조회한다.
+    """
+    try:
+        return await backfill_weather(session, start_date, end_date, concurrency=concurrency)
+    except WeatherCacheMiss as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
 
 @router.get("/weather", response_model=List[Weather])
-def get_weathers_point(
-    session: SessionDep,
+async def get_weathers_point(
+    session: AsyncReadSessionDep,
     month: Optional[str] = Query(None, description="월(YYYY-MM)"),
 ) -> List[Weather]:
     if month:
-        return read_weathers_by_month(session, month)
+        return await read_weathers_by_month_async(session, month)
     raise HTTPException(status_code=400, detail="month query parameter is required")
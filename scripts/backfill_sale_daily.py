@@ -0,0 +1,41 @@
+import argparse
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from core.data_version import bump_data_version
+from core.migrations import backfill_sale_daily, run_migrations
+import models.data_version  # noqa: F401
+import models.sale  # noqa: F401
+import models.sale_daily  # noqa: F401
+import models.sale_statistics  # noqa: F401
+import models.weather  # noqa: F401
+
+
+def backfill(db_path: str) -> int:
+    engine = create_engine(f"sqlite:///{db_path}")
+
+    # 테이블과 생성 열은 모델 정의 및 마이그레이션과 같게 만든다 (처음 적용 시 마이그레이션 3이 롤업을 채움)
+    SQLModel.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+    # 롤업 전체를 sale 테이블 기준으로 다시 작성 (한 트랜잭션, 실행 중인 앱의 응답 캐시도 무효화)
+    with Session(engine) as session:
+        rows = backfill_sale_daily(session.connection())
+        bump_data_version(session)
+        session.commit()
+
+    engine.dispose()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the sale_daily rollup from the sale table")
+    parser.add_argument("--db", default="sales.db", help="SQLite DB path")
+    args = parser.parse_args()
+
+    rows = backfill(args.db)
+    print(f"Backfilled {rows} sale_daily rows in {args.db}")
+
+
+if __name__ == "__main__":
+    main()
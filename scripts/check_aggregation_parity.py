@@ -0,0 +1,150 @@
+"""
+열 단위 통계 집계(service.sale_aggregation)와 기존 행 단위 집계 결과 비교
+
+무작위 판매 데이터(고정 시드)로 주별/월별/일별 결과(열 단위 일별 응답 포함)와
+utils.calendar의 주/월 구간이 기존 strptime 계산과 같은지 확인한다.
+
+    python -m scripts.check_aggregation_parity --days 1000 --payment-types 6
+"""
+import argparse
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from service.sale_aggregation import aggregate_periods, daily_columns, daily_rows, load_columns
+from utils.calendar import day_key, day_str, month_bounds, week_bounds
+
+
+# 기존 문자열 기반 주/월 계산 (비교 기준)
+
+def _get_monday_of_week(date_str: str) -> str:
+    date = datetime.strptime(date_str, "%Y-%m-%d")
+    weekday = date.weekday()
+
+    if weekday == 6:  # 일요일
+        monday = date + timedelta(days=1)
+    else:
+        monday = date - timedelta(days=weekday)
+
+    return monday.strftime("%Y-%m-%d")
+
+
+def _get_saturday_of_week(monday_str: str) -> str:
+    monday = datetime.strptime(monday_str, "%Y-%m-%d")
+    saturday = monday + timedelta(days=5)
+    return saturday.strftime("%Y-%m-%d")
+
+
+def _get_month_range(date_str: str) -> Tuple[str, str]:
+    date = datetime.strptime(date_str, "%Y-%m-%d")
+    first_day = datetime(date.year, date.month, 1)
+    if date.month == 12:
+        last_day = datetime(date.year, 12, 31)
+    else:
+        last_day = datetime(date.year, date.month + 1, 1) - timedelta(days=1)
+    return first_day.strftime("%Y-%m-%d"), last_day.strftime("%Y-%m-%d")
+
+
+def check_calendar(dates: List[str]) -> None:
+    for input_date in dates:
+        day = day_key(input_date)
+        monday = _get_monday_of_week(input_date)
+        week = tuple(map(day_str, week_bounds(day)))
+        month = tuple(map(day_str, month_bounds(day)))
+        if week != (monday, _get_saturday_of_week(monday)) or month != _get_month_range(input_date):
+            raise SystemExit(f"Calendar buckets differ for {input_date}: week {week}, month {month}")
+
+
+def reference_periods(rows: List[Tuple[str, str, int]]) -> List[tuple]:
+    # 기존 재계산의 행 단위 집계
+    buckets: Dict[Tuple[str, str, str, str], Dict[str, int]] = defaultdict(lambda: {'total': 0, 'count': 0})
+    for input_date, payment_type, amount in rows:
+        monday = _get_monday_of_week(input_date)
+        month_start, month_end = _get_month_range(input_date)
+        for key in (
+            ("week", monday, _get_saturday_of_week(monday)),
+            ("month", month_start, month_end),
+        ):
+            for target in ("all", payment_type):
+                bucket = buckets[key + (target,)]
+                bucket['total'] += amount
+                bucket['count'] += 1
+    return sorted(
+        (period_type, start, end, payment_type, data['total'], data['count'], data['total'] / data['count'])
+        for (period_type, start, end, payment_type), data in buckets.items()
+    )
+
+
+def reference_daily(rows: List[Tuple[str, str, int]]) -> List[tuple]:
+    daily: Dict[str, Dict[str, int]] = defaultdict(dict)
+    for input_date, payment_type, amount in sorted(rows):
+        daily[input_date][payment_type] = daily[input_date].get(payment_type, 0) + amount
+    return [(date, types, sum(types.values())) for date, types in sorted(daily.items())]
+
+
+def reference_daily_columns(rows: List[Tuple[str, str, int]]) -> tuple:
+    daily = reference_daily(rows)
+    payment_types = sorted({payment_type for _, types, _ in daily for payment_type in types})
+    amounts = [[types.get(payment_type) for _, types, _ in daily] for payment_type in payment_types]
+    return [date for date, _, _ in daily], payment_types, amounts, [total for _, _, total in daily]
+
+
+def generate(days: int, payment_types: int, seed: int) -> List[Tuple[str, str, int]]:
+    rng = random.Random(seed)
+    start = datetime(2020, 12, 27)  # 일요일, 연말 경계 포함
+    types = [f"type{index}" for index in range(payment_types)]
+    rows = []
+    for offset in range(days):
+        input_date = (start + timedelta(days=offset)).strftime("%Y-%m-%d")
+        for payment_type in types:
+            if rng.random() < 0.8:
+                rows.append((input_date, payment_type, rng.randint(1, 1_000_000)))
+    rng.shuffle(rows)
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare columnar statistics aggregation with the row-by-row version")
+    parser.add_argument("--days", type=int, default=1000, help="Number of days")
+    parser.add_argument("--payment-types", type=int, default=6, help="Number of payment types")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    rows = generate(args.days, args.payment_types, args.seed)
+    check_calendar(sorted({input_date for input_date, _, _ in rows}))
+
+    started = time.perf_counter()
+    expected = reference_periods(rows)
+    reference_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    # DB의 일 번호 생성 열 대신 day_key로 변환
+    columns = load_columns((day_key(input_date), payment_type, amount, 1) for input_date, payment_type, amount in rows)
+    actual = sorted(
+        (
+            row['period_type'], row['period_start'], row['period_end'], row['payment_type'],
+            row['total_amount'], row['transaction_count'], row['avg_amount'],
+        )
+        for row in aggregate_periods(columns)
+    )
+    columnar_elapsed = time.perf_counter() - started
+
+    if actual != expected:
+        mismatches = [(e, a) for e, a in zip(expected, actual) if e != a][:5]
+        raise SystemExit(f"Period statistics differ ({len(expected)} vs {len(actual)} rows): {mismatches}")
+    # 일별 결과는 (날짜, 결제 타입) 순으로 정렬된 롤업 행을 묶는다
+    if daily_rows(sorted(rows)) != reference_daily(rows):
+        raise SystemExit("Daily statistics differ")
+    if daily_columns(rows) != reference_daily_columns(rows):
+        raise SystemExit("Columnar daily statistics differ")
+
+    print(
+        f"OK: {len(rows)} sales, {len(actual)} period rows "
+        f"(row-by-row {reference_elapsed:.3f}s, columnar {columnar_elapsed:.3f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
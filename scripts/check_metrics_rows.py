@@ -0,0 +1,66 @@
+"""
+비동기(aiosqlite) 조회의 행 수 지표 확인
+
+core/metrics.py는 SQLAlchemy aiosqlite 어댑터 커서의 내부 속성으로 비동기 조회의 행 수를 센다.
+SQLAlchemy 버전을 올린 뒤 이 스크립트로 요청의 db_rows_fetched_total이 실제 조회 행 수와 같은지 확인한다.
+
+    python -m scripts.check_metrics_rows --rows 250
+"""
+import argparse
+import asyncio
+import os
+import re
+import tempfile
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from core.engine import create_app_engine, create_async_app_engine
+from core.metrics import MetricsMiddleware, buffered_rows_supported, render_metrics
+
+ROUTE = "/check-rows"
+
+
+def fetched_rows(metrics: str) -> int:
+    match = re.search(r'db_rows_fetched_total\{method="GET",route="' + ROUTE + r'"\} (\d+)', metrics)
+    return int(match.group(1)) if match else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check that async queries record db_rows_fetched_total")
+    parser.add_argument("--rows", type=int, default=250, help="Rows to fetch")
+    args = parser.parse_args()
+
+    if not buffered_rows_supported():
+        raise SystemExit("The installed SQLAlchemy aiosqlite cursor no longer exposes buffered rows")
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'rows.db')}"
+        engine = create_app_engine(url)
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE item (id INTEGER PRIMARY KEY)"))
+            conn.execute(text("INSERT INTO item (id) VALUES (:id)"), [{"id": i} for i in range(args.rows)])
+        engine.dispose()
+
+        async_engine = create_async_app_engine(url)
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+
+        @app.get(ROUTE)
+        async def read_rows() -> int:
+            async with async_engine.connect() as conn:
+                return len((await conn.execute(text("SELECT id FROM item"))).all())
+
+        with TestClient(app) as client:
+            returned = client.get(ROUTE).json()
+        asyncio.run(async_engine.dispose())
+
+    recorded = fetched_rows(render_metrics())
+    if recorded != returned:
+        raise SystemExit(f"db_rows_fetched_total recorded {recorded} rows, query returned {returned}")
+    print(f"OK: {recorded} rows recorded for {returned} fetched")
+
+
+if __name__ == "__main__":
+    main()
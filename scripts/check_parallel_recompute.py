@@ -0,0 +1,84 @@
+"""
+병렬 통계 재계산과 순차 재계산 결과 비교
+
+같은 판매 데이터로 순차(workers=1)/병렬 재계산을 각각 실행하고
+sale_statistics 행(id 순서 포함, 생성 시각 제외)이 같은지 확인한다. 전체와 날짜 범위 재계산을 모두 확인한다.
+병렬 재계산은 판매 수와 관계없이(parallel_min_rows=0) 앱과 같은 공유 프로세스 풀로 실행한다.
+
+    python -m scripts.check_parallel_recompute --days 1500 --payment-types 8 --workers 4
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from typing import List, Optional
+
+from sqlmodel import Session, create_engine, select
+
+from models.sale_statistics import SaleStatistics
+from scripts.check_recompute_memory import build_database
+from service.sale_statistics import recompute_statistics, shutdown_recompute_executors
+
+# 비교할 열 (created_at/updated_at은 실행 시각이므로 제외)
+COMPARED_COLUMNS = (
+    "id", "period_type", "period_start", "period_end", "payment_type",
+    "total_amount", "transaction_count", "avg_amount",
+)
+
+
+def run(path: str, workers: int, start_date: Optional[str], end_date: Optional[str]) -> List[tuple]:
+    engine = create_engine(f"sqlite:///{path}")
+    with Session(engine) as session:
+        started = time.perf_counter()
+        recompute_statistics(session, start_date, end_date, workers=workers, parallel_min_rows=0)
+        elapsed = time.perf_counter() - started
+        rows = [
+            tuple(getattr(stat, column) for column in COMPARED_COLUMNS)
+            for stat in session.exec(select(SaleStatistics).order_by(SaleStatistics.id)).all()
+        ]
+    engine.dispose()
+    print(f"  workers={workers}: {len(rows)} rows in {elapsed:.2f}s")
+    return rows
+
+
+def recompute_all(path: str) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    with Session(engine) as session:
+        recompute_statistics(session, workers=1)
+    engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare parallel statistics recompute with the serial path")
+    parser.add_argument("--days", type=int, default=1500, help="Number of days")
+    parser.add_argument("--payment-types", type=int, default=8, help="Number of payment types")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes for the parallel run")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "source.db")
+        sales = build_database(source, args.days, args.payment_types, 0.8, args.seed)
+        print(f"{sales} sales")
+
+        # 전체 재계산, 그리고 전체 통계가 있는 상태에서 월/주 경계를 걸치는 범위 재계산
+        for scope in ((None, None), ("2015-03-31", "2016-02-01")):
+            print(f"scope {scope[0] or 'all'}~{scope[1] or ''}")
+            results = []
+            for workers in (1, args.workers):
+                path = os.path.join(directory, f"{scope[0] or 'all'}-workers-{workers}.db")
+                shutil.copyfile(source, path)
+                if scope[0]:
+                    recompute_all(path)
+                results.append(run(path, workers, *scope))
+            if results[0] != results[1]:
+                mismatches = [(s, p) for s, p in zip(*results) if s != p][:5]
+                raise SystemExit(f"Parallel recompute differs ({len(results[0])} vs {len(results[1])} rows): {mismatches}")
+    shutdown_recompute_executors()
+
+    print("OK: parallel recompute matches the serial path")
+
+
+if __name__ == "__main__":
+    main()
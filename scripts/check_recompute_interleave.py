@@ -0,0 +1,115 @@
+"""
+겹쳐 실행된 통계 재계산 확인
+
+한 재계산(1월 범위)이 집계를 마친 뒤 교체하기 전에 다른 연결에서
+전체 재계산이 끝나거나 스테이징 테이블에 다른 작업의 행이 남아 있어도,
+sale_statistics에 중복 키가 없고 결과가 단독 전체 재계산과 같은지 확인한다.
+(다른 워커/CLI의 재계산과 겹치는 경우)
+
+    python -m scripts.check_recompute_interleave --days 120 --payment-types 3
+"""
+import argparse
+import os
+import shutil
+import tempfile
+from typing import Callable, List
+
+from sqlalchemy import insert
+from sqlmodel import Session, create_engine, func, select
+
+from models.sale_statistics import SaleStatistics, SaleStatisticsStaging
+from scripts.check_recompute_memory import build_database
+from service.sale_statistics import recompute_statistics
+
+# 비교할 열 (id와 생성 시각 제외)
+COMPARED_COLUMNS = (
+    "period_type", "period_start", "period_end", "payment_type",
+    "total_amount", "transaction_count", "avg_amount",
+)
+JANUARY = ("2015-01-01", "2015-01-31")
+
+
+def statistics_rows(path: str) -> List[tuple]:
+    engine = create_engine(f"sqlite:///{path}")
+    with Session(engine) as session:
+        duplicates = session.exec(
+            select(SaleStatistics.period_type, SaleStatistics.period_start, SaleStatistics.payment_type)
+            .group_by(SaleStatistics.period_type, SaleStatistics.period_start, SaleStatistics.payment_type)
+            .having(func.count() > 1)
+        ).all()
+        if duplicates:
+            raise SystemExit(f"Duplicate statistics keys after interleaved recompute: {duplicates[:5]}")
+        rows = sorted(
+            tuple(getattr(stat, column) for column in COMPARED_COLUMNS)
+            for stat in session.exec(select(SaleStatistics)).all()
+        )
+    engine.dispose()
+    return rows
+
+
+def full_recompute(path: str) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    with Session(engine) as session:
+        recompute_statistics(session, workers=1)
+    engine.dispose()
+
+
+def foreign_staging(path: str) -> None:
+    # 다른 작업이 스테이징 테이블에 커밋해 둔 행 (교체에 섞이면 통계 키가 중복된다)
+    engine = create_engine(f"sqlite:///{path}")
+    with Session(engine) as session:
+        rows = [
+            {column: getattr(stat, column) for column in COMPARED_COLUMNS + ("created_at", "updated_at")}
+            for stat in session.exec(select(SaleStatistics)).all()
+        ]
+        session.exec(insert(SaleStatisticsStaging.__table__), params=rows)
+        session.commit()
+    engine.dispose()
+
+
+def run_interleaved(path: str, interleave: Callable[[str], None]) -> None:
+    """
+    1월 재계산이 보고하는 중간 진행률(집계 완료 이후 ~ 교체 전)마다 interleave를 한 번씩 실행
+    """
+    done = set()
+
+    def progress(value: float) -> None:
+        if 0.4 <= value < 1.0 and value not in done:
+            done.add(value)
+            interleave(path)
+
+    engine = create_engine(f"sqlite:///{path}")
+    with Session(engine) as session:
+        recompute_statistics(session, *JANUARY, progress=progress, workers=1)
+    engine.dispose()
+    if not done:
+        raise SystemExit("The interleaved step did not run")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check statistics recompute when another recompute interleaves")
+    parser.add_argument("--days", type=int, default=120, help="Number of days")
+    parser.add_argument("--payment-types", type=int, default=3, help="Number of payment types")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "source.db")
+        sales = build_database(source, args.days, args.payment_types, 0.8, args.seed)
+        full_recompute(source)
+        expected = statistics_rows(source)
+        print(f"{sales} sales, {len(expected)} statistics rows")
+
+        for name, interleave in (("full recompute", full_recompute), ("foreign staging rows", foreign_staging)):
+            path = os.path.join(directory, f"{name.replace(' ', '-')}.db")
+            shutil.copyfile(source, path)
+            run_interleaved(path, interleave)
+            if statistics_rows(path) != expected:
+                raise SystemExit(f"Statistics differ after January recompute interleaved with {name}")
+            print(f"  {name}: ok")
+
+    print("OK: interleaved recomputes leave the statistics of a single full recompute")
+
+
+if __name__ == "__main__":
+    main()
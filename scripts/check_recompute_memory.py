@@ -0,0 +1,96 @@
+"""
+통계 재계산 메모리 사용량 점검
+
+같은 기간/결제 타입(=같은 통계 구간 수)에 판매 밀도만 다른 두 DB를 만들어
+재계산 최대 메모리(tracemalloc)를 비교한다. 메모리는 입력 행 수가 아니라
+구간 수에 비례해야 하므로, 행 수가 몇 배로 늘어도 최대 메모리는 거의 같아야 한다.
+
+    python -m scripts.check_recompute_memory --days 3650 --payment-types 20
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Tuple
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from models.sale import SYNC_PENDING
+from service.sale_statistics import recompute_statistics
+
+# 밀도가 높은 DB의 최대 메모리가 낮은 DB 대비 이 배수를 넘으면 실패
+MAX_PEAK_RATIO = 1.5
+
+
+def build_database(path: str, days: int, payment_types: int, density: float, seed: int) -> int:
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    engine.dispose()
+
+    rng = random.Random(seed)
+    start = datetime(2015, 1, 1)
+    created_at = datetime.utcnow().isoformat(sep=" ")
+    rows = [
+        (
+            (start + timedelta(days=offset)).strftime("%Y-%m-%d"),
+            f"type{index}",
+            rng.randint(1, 1_000_000),
+            created_at,
+            SYNC_PENDING,
+        )
+        for offset in range(days)
+        for index in range(payment_types)
+        if rng.random() < density
+    ]
+
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO sale (input_date, payment_type, amount, created_at, sync_status) VALUES (?, ?, ?, ?, ?)", rows
+    )
+    conn.commit()
+    conn.close()
+    return len(rows)
+
+
+def measure(path: str) -> Tuple[int, int]:
+    engine = create_engine(f"sqlite:///{path}")
+    with Session(engine) as session:
+        tracemalloc.start()
+        statistics = recompute_statistics(session)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    engine.dispose()
+    return statistics, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check that recompute memory tracks buckets, not input rows")
+    parser.add_argument("--days", type=int, default=3650, help="Number of days")
+    parser.add_argument("--payment-types", type=int, default=20, help="Number of payment types")
+    parser.add_argument("--sparse", type=float, default=0.25, help="Share of (day, payment type) pairs in the small DB")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, density in (("sparse", args.sparse), ("dense", 1.0)):
+            path = os.path.join(tmp, f"{name}.db")
+            sales = build_database(path, args.days, args.payment_types, density, args.seed)
+            statistics, peak = measure(path)
+            results.append((sales, statistics, peak))
+            print(f"{name}: {sales} sales -> {statistics} statistics rows, peak {peak / 1024 / 1024:.1f}MB")
+
+    (sparse_sales, _, sparse_peak), (dense_sales, _, dense_peak) = results
+    ratio = dense_peak / sparse_peak
+    if ratio > MAX_PEAK_RATIO:
+        raise SystemExit(
+            f"Peak memory grew {ratio:.2f}x for {dense_sales / sparse_sales:.1f}x sales (limit {MAX_PEAK_RATIO}x)"
+        )
+    print(f"OK: peak memory {ratio:.2f}x for {dense_sales / sparse_sales:.1f}x sales")
+
+
+if __name__ == "__main__":
+    main()
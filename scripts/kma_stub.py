@@ -0,0 +1,82 @@
+"""
+로컬 KMA(ASOS 일자료) 대체 서버
+
+실제 API 대신 날짜별로 고정된(결정적) 관측값을 돌려준다. 페이지 조회와 장애 주입을 지원한다.
+
+    uvicorn scripts.kma_stub:app --port 8001
+    KMA_API_URL=http://127.0.0.1:8001/1360000/AsosDalyInfoService/getWthrDataList
+
+환경 변수:
+    KMA_STUB_FAILURE_RATE: 503을 돌려줄 확률 (0~1, 기본 0)
+    KMA_STUB_LATENCY: 응답 지연 (초, 기본 0)
+"""
+import asyncio
+import math
+import os
+import random
+from datetime import datetime, timedelta
+from hashlib import sha256
+
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
+
+app = FastAPI()
+
+FAILURE_RATE = float(os.getenv("KMA_STUB_FAILURE_RATE", "0"))
+LATENCY = float(os.getenv("KMA_STUB_LATENCY", "0"))
+
+
+def _observation(day: datetime, station_id: int) -> dict:
+    seed = int(sha256(f"{station_id}:{day:%Y%m%d}".encode()).hexdigest()[:8], 16)
+    rng = random.Random(seed)
+    season = -10 * math.cos((day.timetuple().tm_yday - 15) / 365 * 2 * math.pi)
+    avg_temp = round(13 + season + rng.uniform(-3, 3), 1)
+    rain = round(rng.choice([0, 0, 0, 0, rng.uniform(0.1, 40)]), 1)
+    return {
+        "stnId": str(station_id),
+        "tm": day.strftime("%Y-%m-%d"),
+        "avgTa": str(avg_temp),
+        "minTa": str(round(avg_temp - rng.uniform(2, 7), 1)),
+        "maxTa": str(round(avg_temp + rng.uniform(2, 7), 1)),
+        "sumRn": str(rain) if rain else "",
+        "hr1MaxRn": str(round(rain / rng.uniform(2, 6), 1)) if rain else "",
+        "avgRhm": str(round(rng.uniform(30, 90), 1)),
+        "avgTca": str(round(rng.uniform(0, 10), 1)),
+    }
+
+
+@app.get("/1360000/AsosDalyInfoService/getWthrDataList")
+async def get_weather_data_list(
+    startDt: str,
+    endDt: str,
+    stnIds: int = 108,
+    numOfRows: int = Query(10, ge=1),
+    pageNo: int = Query(1, ge=1),
+):
+    if LATENCY:
+        await asyncio.sleep(LATENCY)
+    if FAILURE_RATE and random.random() < FAILURE_RATE:
+        return JSONResponse(status_code=503, content={"detail": "stub failure"})
+
+    start = datetime.strptime(startDt, "%Y%m%d")
+    end = datetime.strptime(endDt, "%Y%m%d")
+    total = max((end - start).days + 1, 0)
+    offset = (pageNo - 1) * numOfRows
+    days = [start + timedelta(days=i) for i in range(offset, min(offset + numOfRows, total))]
+
+    if total == 0:
+        header = {"resultCode": "03", "resultMsg": "NO_DATA"}
+        return {"response": {"header": header}}
+
+    return {
+        "response": {
+            "header": {"resultCode": "00", "resultMsg": "NORMAL_SERVICE"},
+            "body": {
+                "dataType": "JSON",
+                "items": {"item": [_observation(day, stnIds) for day in days]},
+                "pageNo": pageNo,
+                "numOfRows": numOfRows,
+                "totalCount": total,
+            },
+        }
+    }
@@ -1,6 +1,8 @@
 import argparse
 import sqlite3
 
+from core.data_version import DATA_VERSION_BUMP_SQL
+
 
 def migrate(db_path: str) -> None:
     conn = sqlite3.connect(db_path)
@@ -28,6 +30,10 @@ def migrate(db_path: str) -> None:
         """
     )
 
+    # 실행 중인 앱의 응답 캐시 무효화 (data_version 테이블이 없으면 캐시를 쓰는 앱이 실행된 적 없는 DB)
+    if cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'data_version'").fetchone():
+        cursor.execute(DATA_VERSION_BUMP_SQL)
+
     conn.commit()
     conn.close()
 
@@ -0,0 +1,133 @@
+"""
+통계 재계산 백그라운드 작업
+
+재계산은 단일 작업 스레드에서 순서대로 실행되며, 같은 범위의 작업이 실행 중이거나
+대기 중이면 새 요청은 그 작업으로 합쳐진다.
+집계 자체는 RECOMPUTE_WORKERS 설정에 따라 여러 프로세스로 나눠 실행될 수 있다.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from sqlmodel import Session
+
+from core.db import engine
+from models.sale_statistics import RecomputeJobResponse
+from service.sale_statistics import recompute_statistics, recompute_dirty_statistics
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+SCOPE_ALL = "all"
+SCOPE_DIRTY = "dirty"
+
+# 조회용으로 보관하는 완료 작업 수
+MAX_FINISHED_JOBS = 50
+
+
+def job_scope(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    dirty: bool = False,
+) -> str:
+    if dirty:
+        return SCOPE_DIRTY
+    if start_date and end_date:
+        return f"{start_date}~{end_date}"
+    return SCOPE_ALL
+
+
+class RecomputeJobManager:
+    def __init__(self):
+        self._jobs: "OrderedDict[str, RecomputeJobResponse]" = OrderedDict()
+        self._active_jobs: Dict[str, str] = {}  # scope -> job_id
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recompute")
+
+    def submit(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        dirty: bool = False,
+    ) -> RecomputeJobResponse:
+        """
+        재계산 작업 등록 (같은 범위의 작업이 진행 중이면 해당 작업 반환)
+
+        Args:
+            start_date, end_date: 재계산 날짜 범위 (미지정 시 전체)
+            dirty: 변경 기록이 있는 기간만 재계산
+        """
+        scope = job_scope(start_date, end_date, dirty)
+        with self._lock:
+            active_job_id = self._active_jobs.get(scope)
+            if active_job_id is not None:
+                return self._jobs[active_job_id].model_copy()
+
+            job = RecomputeJobResponse(
+                job_id=uuid.uuid4().hex,
+                scope=scope,
+                status=JOB_PENDING,
+                progress=0.0,
+                created_at=datetime.now(timezone.utc),
+            )
+            self._jobs[job.job_id] = job
+            self._active_jobs[scope] = job.job_id
+            self._trim()
+
+        self._executor.submit(self._run, job.job_id, start_date, end_date, dirty)
+        return job.model_copy()
+
+    def get(self, job_id: str) -> Optional[RecomputeJobResponse]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.model_copy() if job else None
+
+    def _update(self, job_id: str, **values) -> None:
+        with self._lock:
+            job = self._jobs[job_id]
+            for name, value in values.items():
+                setattr(job, name, value)
+
+    def _run(
+        self,
+        job_id: str,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        dirty: bool,
+    ) -> None:
+        self._update(job_id, status=JOB_RUNNING)
+
+        def progress(value: float) -> None:
+            self._update(job_id, progress=round(value, 3))
+
+        try:
+            with Session(engine) as session:
+                if dirty:
+                    rows = recompute_dirty_statistics(session, progress=progress)
+                else:
+                    rows = recompute_statistics(session, start_date, end_date, progress=progress)
+            self._update(job_id, status=JOB_DONE, progress=1.0, detail=f"{rows} rows")
+        except Exception as e:
+            self._update(job_id, status=JOB_FAILED, detail=str(e))
+        finally:
+            with self._lock:
+                job = self._jobs[job_id]
+                job.finished_at = datetime.now(timezone.utc)
+                if self._active_jobs.get(job.scope) == job_id:
+                    del self._active_jobs[job.scope]
+
+    def _trim(self) -> None:
+        finished = [
+            job_id for job_id, job in self._jobs.items()
+            if job.status in (JOB_DONE, JOB_FAILED)
+        ]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+
+recompute_jobs = RecomputeJobManager()
@@ -1,11 +1,43 @@
 from fastapi import HTTPException
-from collections import defaultdict
 from math import ceil
 
-from models.sale import Sale, SaleCreate, SaleUpdate, SaleListResponse, DailySaleByPaymentType, SaleDelete, MonthlySaleResponse, DailySaleTotal
-from core.db import SessionDep
-from sqlmodel import select
-from typing import List
+from pydantic import ValidationError
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models.sale import Sale, sale_input_day, SaleCreate, SaleUpdate, SaleListResponse, DailySaleByPaymentType, SaleDelete, MonthlySaleResponse, DailySaleTotal, SaleBulkResponse
+from core.db import SessionDep, read_engine, upsert_insert
+from core.data_version import bump_data_version
+from models.sale_daily import SaleDaily, sale_daily_input_day
+from service.sale_daily import apply_daily_deltas
+from service.sale_statistics import apply_sale_deltas, mark_dirty_dates
+from sqlmodel import select, func
+from sqlalchemy import Engine, distinct, tuple_
+from sqlalchemy.exc import IntegrityError
+from typing import List, Dict, Optional, Iterable, Iterator, Tuple, AsyncIterator
+from utils.calendar import day_key, month_key_bounds
+from utils.export import EXPORT_CSV, iter_export
+from utils.json_response import dump_columns, dumps
+
+# 벌크 입력 시 한 번의 upsert로 처리할 레코드 수
+BULK_BATCH_SIZE = 500
+
+# 월별 판매 응답 필드 (DailySaleTotal과 같은 순서)
+MONTHLY_FIELDS = tuple(DailySaleTotal.model_fields)
+
+# 판매 내보내기 필드 (CSV 헤더 순서)
+SALE_EXPORT_FIELDS = ("id", "input_date", "payment_type", "amount", "created_at")
+
+
+def _apply_sale_deltas(
+    session: SessionDep,
+    deltas: Iterable[Tuple[str, str, int, int]],
+) -> None:
+    # 일별 롤업과 주별/월별 통계를 판매 변경과 같은 트랜잭션에서 갱신하고 변경 날짜 기록
+    deltas = list(deltas)
+    apply_daily_deltas(session, deltas)
+    apply_sale_deltas(session, deltas)
+    mark_dirty_dates(session, [input_date for input_date, _, _, _ in deltas])
+
 
 def crate_sale(
     session: SessionDep,
@@ -13,65 +45,205 @@ def crate_sale(
 ) -> Sale:
     sale = Sale(**data.model_dump())
     session.add(sale)
+    try:
+        session.flush()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(status_code=409, detail="Sale already exists")
+    _apply_sale_deltas(session, [(sale.input_date, sale.payment_type, sale.amount, 1)])
+    bump_data_version(session)
     session.commit()
     session.refresh(sale)
     return sale
 
-def get_sales(
+def _to_sale_create(record: Optional[dict]) -> Optional[SaleCreate]:
+    if record is None:
+        return None
+    try:
+        return SaleCreate.model_validate(record)
+    except ValidationError:
+        return None
+
+
+def upsert_sale_batch(
+    session: SessionDep,
+    sales: List[SaleCreate],
+) -> Tuple[int, int]:
+    """
+    판매 데이터 배치를 (input_date, payment_type) 기준으로 upsert
+
+    커밋은 호출자가 수행한다. 배치 안에서 같은 키가 반복되면 마지막 값이 반영되고 한 번만 센다.
+
+    Returns:
+        (추가 건수, 수정 건수) - 수정은 배치 전에 DB에 있던 키
+    """
+    latest: Dict[Tuple[str, str], SaleCreate] = {}
+    for sale in sales:
+        latest[(sale.input_date, sale.payment_type)] = sale
+
+    if not latest:
+        return 0, 0
+
+    # 배치 키 중 이미 있는 판매의 금액을 한 번에 조회해 추가/수정 구분과 통계 변화량 계산
+    existing = {
+        (input_date, payment_type): amount
+        for input_date, payment_type, amount in session.exec(
+            select(Sale.input_date, Sale.payment_type, Sale.amount)
+            .where(tuple_(Sale.input_date, Sale.payment_type).in_(list(latest)))
+        ).all()
+    }
+
+    inserted = updated = 0
+    deltas = []
+    for key, sale in latest.items():
+        if key in existing:
+            updated += 1
+            deltas.append((*key, sale.amount - existing[key], 0))
+        else:
+            inserted += 1
+            deltas.append((*key, sale.amount, 1))
+
+    stmt = upsert_insert(session, Sale.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["input_date", "payment_type"],
+        set_={"amount": stmt.excluded.amount},
+    )
+    session.exec(stmt, params=[sale.model_dump() for sale in latest.values()])
+
+    _apply_sale_deltas(session, deltas)
+    return inserted, updated
+
+
+async def bulk_upsert_sales(
+    session: AsyncSession,
+    records: AsyncIterator[Optional[dict]],
+    batch_size: int = BULK_BATCH_SIZE,
+) -> SaleBulkResponse:
+    """
+    판매 레코드 스트림을 배치 단위로 upsert 후 한 번에 커밋
+
+    검증에 실패한 레코드는 건너뛰고 rejected로 집계한다.
+    """
+    inserted = updated = rejected = 0
+    batch: List[SaleCreate] = []
+
+    async for record in records:
+        sale = _to_sale_create(record)
+        if sale is None:
+            rejected += 1
+            continue
+        batch.append(sale)
+        if len(batch) >= batch_size:
+            batch_inserted, batch_updated = await session.run_sync(upsert_sale_batch, batch)
+            inserted += batch_inserted
+            updated += batch_updated
+            batch = []
+
+    if batch:
+        batch_inserted, batch_updated = await session.run_sync(upsert_sale_batch, batch)
+        inserted += batch_inserted
+        updated += batch_updated
+
+    await session.run_sync(bump_data_version)
+    await session.commit()
+    return SaleBulkResponse(inserted=inserted, updated=updated, rejected=rejected)
+
+
+def _sales_page(
     session: SessionDep,
     page: int = 1,
     page_size: int = 10,
-) -> SaleListResponse:
-    # 모든 판매 데이터 조회
-    sales = session.exec(
-        select(Sale)
-        .order_by(Sale.input_date)
-    ).all()
+    cursor: Optional[str] = None,
+) -> dict:
+    # SaleListResponse와 같은 구조의 dict
+    # cursor 요청은 전체 날짜 수를 세지 않는다 (total/total_pages는 None, 페이지 비용이 전체 기간과 무관)
+    total: Optional[int] = None
+    total_pages: Optional[int] = None
+    if not cursor:
+        # 전체 날짜 수 (일별 롤업 기준)
+        total = session.exec(select(func.count(distinct(SaleDaily.input_date)))).one()
 
-    if not sales:
-        raise HTTPException(status_code=404, detail="Sales not found")
+        if not total:
+            raise HTTPException(status_code=404, detail="Sales not found")
 
-    # 날짜별로 그룹화하여 결제 타입별 금액 집계
-    daily_sales_dict = defaultdict(lambda: defaultdict(int))
+        # 페이지네이션 계산
+        total_pages = ceil(total / page_size)
 
-    for sale in sales:
-        daily_sales_dict[sale.input_date][sale.payment_type] += sale.amount
-
-    # DailySaleByPaymentType 리스트 생성
-    daily_sales_list = []
-    for date, payment_types in sorted(daily_sales_dict.items()):
-        total_amount = sum(payment_types.values())
-        daily_sales_list.append(
-            DailySaleByPaymentType(
-                date=date,
-                payment_types=dict(payment_types),
-                total_amount=total_amount
-            )
-        )
+        # 페이지 범위 검증
+        if page < 1:
+            page = 1
+        if page > total_pages:
+            page = total_pages
 
-    # 페이지네이션 계산
-    total = len(daily_sales_list)
-    total_pages = ceil(total / page_size)
+    # 현재 페이지에 해당하는 날짜만 SQL에서 선택 (cursor가 있으면 keyset 방식)
+    page_dates = (
+        select(SaleDaily.input_date)
+        .group_by(SaleDaily.input_date)
+        .order_by(SaleDaily.input_date)
+        .limit(page_size)
+    )
+    if cursor:
+        page_dates = page_dates.where(SaleDaily.input_date > cursor)
+    else:
+        page_dates = page_dates.offset((page - 1) * page_size)
+    page_dates = page_dates.subquery()
+
+    # 선택된 날짜의 결제 타입별 금액
+    rows = session.exec(
+        select(SaleDaily.input_date, SaleDaily.payment_type, SaleDaily.total_amount)
+        .where(SaleDaily.input_date.in_(select(page_dates.c.input_date)))
+        .order_by(SaleDaily.input_date, SaleDaily.payment_type)
+    ).all()
+
+    # 날짜별 결제 타입 금액 묶기
+    daily_sales_dict: Dict[str, Dict[str, int]] = {}
+    for date, payment_type, amount in rows:
+        daily_sales_dict.setdefault(date, {})[payment_type] = amount
+
+    paginated_data = [
+        {
+            "date": date,
+            "payment_types": payment_types,
+            "total_amount": sum(payment_types.values()),
+        }
+        for date, payment_types in daily_sales_dict.items()
+    ]
+
+    next_cursor = paginated_data[-1]["date"] if len(paginated_data) == page_size else None
 
-    # 페이지 범위 검증
-    if page < 1:
-        page = 1
-    if page > total_pages and total_pages > 0:
-        page = total_pages
+    return {
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": total_pages,
+        "next_cursor": next_cursor,
+        "data": paginated_data,
+    }
 
-    # 페이지네이션 적용
-    start_idx = (page - 1) * page_size
-    end_idx = start_idx + page_size
-    paginated_data = daily_sales_list[start_idx:end_idx]
 
+def get_sales(
+    session: SessionDep,
+    page: int = 1,
+    page_size: int = 10,
+    cursor: Optional[str] = None,
+) -> SaleListResponse:
+    result = _sales_page(session, page, page_size, cursor)
     return SaleListResponse(
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=total_pages,
-        data=paginated_data
+        **{**result, "data": [DailySaleByPaymentType(**daily) for daily in result["data"]]}
     )
 
+
+def get_sales_json(
+    session: SessionDep,
+    page: int = 1,
+    page_size: int = 10,
+    cursor: Optional[str] = None,
+) -> bytes:
+    """
+    get_sales 결과를 모델 생성 없이 JSON 바이트로 반환 (API 응답용)
+    """
+    return dumps(_sales_page(session, page, page_size, cursor))
+
 def get_sale(
     session: SessionDep,
     sale_id: int,
@@ -82,39 +254,89 @@ def get_sale(
         raise HTTPException(status_code=404, detail="Sale not found")
     return sale
 
-def get_sale_by_month(
+def _monthly_rows(
     session: SessionDep,
     month: str,
-) -> MonthlySaleResponse:
-    print(month)
-    # YYYY-MM 형식으로 시작하는 날짜 필터링
-    sales = session.exec(
-        select(Sale)
-        .where(Sale.input_date.startswith(month))
-        .order_by(Sale.input_date)
+) -> List[Tuple[str, int]]:
+    try:
+        first_day, last_day = month_key_bounds(month)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="key must be YYYY-MM")
+
+    # 해당 월(일 번호 범위)의 일별 총 금액 집계
+    rows = session.exec(
+        select(SaleDaily.input_date, func.sum(SaleDaily.total_amount))
+        .where(sale_daily_input_day.between(first_day, last_day))
+        .group_by(SaleDaily.input_date)
+        .order_by(SaleDaily.input_date)
     ).all()
 
-    if not sales:
+    if not rows:
         raise HTTPException(status_code=404, detail="Sales not found")
+    return rows
 
-    # 날짜별로 총 금액 집계
-    daily_totals = defaultdict(int)
-
-    for sale in sales:
-        daily_totals[sale.input_date] += sale.amount
-
+def get_sale_by_month(
+    session: SessionDep,
+    month: str,
+) -> MonthlySaleResponse:
     # DailySaleTotal 리스트 생성
-    daily_sales_list = []
-    for date, total_amount in sorted(daily_totals.items()):
-        daily_sales_list.append(
-            DailySaleTotal(
-                date=date,
-                total_amount=total_amount
-            )
+    daily_sales_list = [
+        DailySaleTotal(
+            date=date,
+            total_amount=total_amount
         )
+        for date, total_amount in _monthly_rows(session, month)
+    ]
 
     return MonthlySaleResponse(data=daily_sales_list)
-    
+
+
+def get_sale_by_month_json(
+    session: SessionDep,
+    month: str,
+    columnar: bool = False,
+) -> bytes:
+    """
+    get_sale_by_month 결과를 모델 생성 없이 JSON 바이트로 반환 (API 응답용)
+
+    columnar이면 {"date": [...], "total_amount": [...]} 형태로 반환한다.
+    """
+    rows = _monthly_rows(session, month)
+    if columnar:
+        return dump_columns(MONTHLY_FIELDS, rows)
+    return dumps({"data": [dict(zip(MONTHLY_FIELDS, row)) for row in rows]})
+
+
+def export_sales(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    payment_type: Optional[str] = None,
+    export_format: str = EXPORT_CSV,
+    engine: Optional[Engine] = None,
+) -> Iterator[bytes]:
+    """
+    판매 데이터 내보내기 (CSV/NDJSON 스트림, 날짜/결제 타입 순)
+
+    조건은 스트림을 시작하기 전에 검증하고(잘못된 날짜는 400),
+    조회는 응답을 보내는 동안 읽기 전용 연결(engine 미지정 시 read_engine)에서 청크 단위로 실행한다.
+    """
+    query = select(*[Sale.__table__.c[name] for name in SALE_EXPORT_FIELDS])
+
+    try:
+        if start_date:
+            query = query.where(sale_input_day >= day_key(start_date))
+        if end_date:
+            query = query.where(sale_input_day <= day_key(end_date))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start_date and end_date must be YYYY-MM-DD")
+
+    if payment_type:
+        query = query.where(Sale.payment_type == payment_type)
+
+    # 일 번호 인덱스 순서로 읽으므로 정렬은 하루치 행 안에서만 일어난다
+    query = query.order_by(sale_input_day, Sale.payment_type)
+    return iter_export(engine or read_engine, query, SALE_EXPORT_FIELDS, export_format)
+
 
 def update_sale(
     session: SessionDep,
@@ -130,10 +352,14 @@ def update_sale(
     if not sale:
         raise HTTPException(status_code=404, detail="Sale not found")
 
+    # 통계에는 금액 차이만 반영
+    _apply_sale_deltas(session, [(sale.input_date, sale.payment_type, data.amount - sale.amount, 0)])
+
     # amount와 sync_status 업데이트
     sale.amount = data.amount
     sale.sync_status = data.sync_status
     session.add(sale)
+    bump_data_version(session)
     session.commit()
     session.refresh(sale)
     return sale
@@ -153,6 +379,44 @@ def delete_sale(
         raise HTTPException(status_code=404, detail="Sale not found")
 
     # sale 삭제
+    _apply_sale_deltas(session, [(sale.input_date, sale.payment_type, -sale.amount, -1)])
     session.delete(sale)
+    bump_data_version(session)
     session.commit()
     return sale
+
+
+# 비동기 버전 (API 요청용). 동기 함수를 AsyncSession.run_sync로 실행하므로
+# 비즈니스 로직은 한 곳에만 있고, 동기 함수는 스크립트/백그라운드 작업에서 그대로 사용한다.
+
+async def crate_sale_async(session: AsyncSession, data: SaleCreate) -> Sale:
+    return await session.run_sync(crate_sale, data)
+
+
+async def get_sales_json_async(
+    session: AsyncSession,
+    page: int = 1,
+    page_size: int = 10,
+    cursor: Optional[str] = None,
+) -> bytes:
+    return await session.run_sync(get_sales_json, page, page_size, cursor)
+
+
+async def get_sale_async(session: AsyncSession, sale_id: int) -> Sale:
+    return await session.run_sync(get_sale, sale_id)
+
+
+async def get_sale_by_month_json_async(
+    session: AsyncSession,
+    month: str,
+    columnar: bool = False,
+) -> bytes:
+    return await session.run_sync(get_sale_by_month_json, month, columnar)
+
+
+async def update_sale_async(session: AsyncSession, data: SaleUpdate) -> Sale:
+    return await session.run_sync(update_sale, data)
+
+
+async def delete_sale_async(session: AsyncSession, data: SaleDelete) -> Sale:
+    return await session.run_sync(delete_sale, data)
@@ -0,0 +1,221 @@
+"""
+판매 데이터 열(column) 단위 집계
+
+(일 번호, payment_type, amount) 세 열만 NumPy 배열로 읽어
+날짜는 DB의 일 번호 생성 열(utils/calendar.py)을 그대로 사용하고, 주/월 구간별 합계는 정렬 + reduceat 으로 계산한다.
+조회 결과는 청크 단위로 읽어 구간 합계에 누적하므로, 메모리는 입력 행 수가 아니라 구간 수에 비례한다.
+일별 응답은 이미 (날짜, 결제 타입)별로 롤업된 sale_daily 행을 날짜별로 묶거나(daily_rows) 배열로 바꾼다(daily_columns).
+"""
+from datetime import datetime, timezone
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlmodel import Session
+
+# 조회 결과를 한 번에 읽어 오는 행 수
+STREAM_CHUNK_SIZE = 10000
+
+# 1970-01-01(목요일) 기준 일 번호에서 요일(월=0)을 구하기 위한 보정값
+_EPOCH_WEEKDAY = 3
+# 요일 번호 (월=0 ... 일=6)
+_SUNDAY = 6
+# 주 종료일(토요일) = 월요일 + 5일
+_WEEK_LENGTH = 5
+
+
+class SaleColumns(NamedTuple):
+    day: np.ndarray           # 1970-01-01 기준 일 번호 (int64)
+    payment_code: np.ndarray  # payment_types 인덱스 (int64)
+    amount: np.ndarray        # 금액 (int64)
+    count: np.ndarray         # 건수 (int64)
+    payment_types: List[str]
+
+
+def load_columns(rows: Iterable[Tuple[int, str, int, int]]) -> SaleColumns:
+    """
+    (일 번호, payment_type, amount, count) 행을 열 배열로 변환
+    """
+    rows = list(rows)
+    if not rows:
+        empty = np.empty(0, dtype=np.int64)
+        return SaleColumns(empty, empty, empty, empty, [])
+
+    days, payment_types, amounts, counts = zip(*rows)
+    day = np.array(days, dtype=np.int64)
+    names, payment_code = np.unique(np.array(payment_types, dtype=object), return_inverse=True)
+    return SaleColumns(
+        day=day,
+        payment_code=payment_code.astype(np.int64),
+        amount=np.array(amounts, dtype=np.int64),
+        count=np.array(counts, dtype=np.int64),
+        payment_types=[str(name) for name in names],
+    )
+
+
+def _to_date_strings(days: np.ndarray) -> List[str]:
+    return np.datetime_as_string(days.astype("datetime64[D]"), unit="D").tolist()
+
+
+def week_start(day: np.ndarray) -> np.ndarray:
+    """
+    주 시작 월요일의 일 번호 (일요일은 다음 주 월요일에 속함)
+    """
+    weekday = (day + _EPOCH_WEEKDAY) % 7
+    return np.where(weekday == _SUNDAY, day + 1, day - weekday)
+
+
+def month_start(day: np.ndarray) -> np.ndarray:
+    return day.astype("datetime64[D]").astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+
+
+def month_end(start: np.ndarray) -> np.ndarray:
+    next_month = start.astype("datetime64[D]").astype("datetime64[M]") + 1
+    return next_month.astype("datetime64[D]").astype(np.int64) - 1
+
+
+def group_sum(keys: np.ndarray, *values: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """
+    정수 키별 합계 (정렬된 고유 키와 각 값 배열의 합계를 반환)
+    """
+    if keys.size == 0:
+        return (keys,) + tuple(value[:0] for value in values)
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(sorted_keys)) + 1))
+    sums = tuple(np.add.reduceat(value[order], starts) for value in values)
+    return (sorted_keys[starts],) + sums
+
+
+def iter_column_chunks(session: Session, query, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[SaleColumns]:
+    """
+    (일 번호, payment_type, amount, count) 조회 결과를 chunk_size 행씩 열 배열로 읽기
+    """
+    result = session.exec(query.execution_options(yield_per=chunk_size))
+    for rows in result.partitions():
+        yield load_columns(rows)
+
+
+def _bucket_sums(starts: np.ndarray, columns: SaleColumns, with_all: bool):
+    # (구간 시작, 결제 타입) 키별 합계 (결제 타입 코드 0..n-1, 전체('all')는 n)
+    n_types = len(columns.payment_types)
+    labels = columns.payment_types + ["all"]
+    keys = starts * (n_types + 1) + columns.payment_code
+    amounts, counts = columns.amount, columns.count
+    if with_all:
+        keys = np.concatenate((keys, starts * (n_types + 1) + n_types))
+        amounts = np.concatenate((amounts, amounts))
+        counts = np.concatenate((counts, counts))
+
+    unique_keys, totals, transaction_counts = group_sum(keys, amounts, counts)
+    for start, code, total, count in zip(
+        (unique_keys // (n_types + 1)).tolist(),
+        (unique_keys % (n_types + 1)).tolist(),
+        totals.tolist(),
+        transaction_counts.tolist(),
+    ):
+        yield start, labels[code], total, count
+
+
+class PeriodAggregator:
+    """
+    청크별 판매 열을 주별/월별 통계(전체 및 결제 타입별)에 누적
+    """
+
+    def __init__(self) -> None:
+        # (period_type, 구간 시작 일 번호, 결제 타입) -> [합계, 건수]
+        self._buckets: Dict[Tuple[str, int, str], List[int]] = {}
+
+    def add(self, columns: SaleColumns) -> "PeriodAggregator":
+        if columns.day.size == 0:
+            return self
+        for period_type, starts in (
+            ("week", week_start(columns.day)),
+            ("month", month_start(columns.day)),
+        ):
+            for start, payment_type, total, count in _bucket_sums(starts, columns, with_all=True):
+                bucket = self._buckets.setdefault((period_type, start, payment_type), [0, 0])
+                bucket[0] += total
+                bucket[1] += count
+        return self
+
+    def rows(self) -> List[dict]:
+        if not self._buckets:
+            return []
+        now = datetime.now(timezone.utc)
+        keys = sorted(self._buckets, key=lambda key: (key[0] != "week", key[1], key[2]))
+        starts = np.array([start for _, start, _ in keys], dtype=np.int64)
+        is_week = np.array([period_type == "week" for period_type, _, _ in keys])
+        ends = np.where(is_week, starts + _WEEK_LENGTH, month_end(starts))
+
+        rows: List[dict] = []
+        for key, start, end in zip(keys, _to_date_strings(starts), _to_date_strings(ends)):
+            period_type, _, payment_type = key
+            total, count = self._buckets[key]
+            rows.append(
+                dict(
+                    period_type=period_type,
+                    period_start=start,
+                    period_end=end,
+                    payment_type=payment_type,
+                    total_amount=total,
+                    transaction_count=count,
+                    avg_amount=total / count if count > 0 else 0,
+                    created_at=now,
+                    updated_at=now,
+                )
+            )
+        return rows
+
+
+def daily_rows(rows: Iterable[Tuple[str, str, int]]) -> List[Tuple[str, Dict[str, int], int]]:
+    """
+    (날짜, payment_type, amount) 조회 결과(날짜, 결제 타입 순) -> [(날짜, {결제 타입: 금액}, 합계)]
+
+    일별 롤업(sale_daily)은 (날짜, 결제 타입)마다 한 행이므로 다시 집계하지 않고 날짜별로 묶기만 한다.
+    """
+    results: List[Tuple[str, Dict[str, int], int]] = []
+    for date, group in groupby(rows, key=itemgetter(0)):
+        by_type = {payment_type: amount for _, payment_type, amount in group}
+        results.append((date, by_type, sum(by_type.values())))
+    return results
+
+
+def _sorted_codes(values: Sequence[str]) -> Tuple[List[str], np.ndarray]:
+    # 고유 값(이름순)과 각 값의 인덱스 (문자열 배열을 정렬하는 np.unique 대신 dict 조회)
+    names = sorted(set(values))
+    index = {name: code for code, name in enumerate(names)}
+    return names, np.fromiter(map(index.__getitem__, values), dtype=np.int64, count=len(values))
+
+
+def daily_columns(
+    rows: Iterable[Tuple[str, str, int]],
+) -> Tuple[List[str], List[str], List[List[Optional[int]]], List[int]]:
+    """
+    (날짜, payment_type, amount) 조회 결과 -> 열 단위 일별 결과
+    (날짜 목록, 결제 타입 목록, 결제 타입별 금액 열, 합계 열)
+
+    행 객체를 만들지 않고 (결제 타입 x 날짜) 배열에 바로 더한다.
+    금액 열은 결제 타입 목록 순서이며, 그날 판매가 없는 결제 타입은 None이다.
+    """
+    columns = list(zip(*rows))
+    if not columns:
+        return [], [], [], []
+
+    dates, day_index = _sorted_codes(columns[0])
+    names, payment_code = _sorted_codes(columns[1])
+    totals = np.zeros((len(names), len(dates)), dtype=np.int64)
+    np.add.at(totals, (payment_code, day_index), np.array(columns[2], dtype=np.int64))
+    has_sales = np.zeros(totals.shape, dtype=bool)
+    has_sales[payment_code, day_index] = True
+
+    amounts = np.where(has_sales, totals.astype(object), None).tolist()
+    return dates, names, amounts, totals.sum(axis=0).tolist()
+
+
+def aggregate_periods(columns: SaleColumns) -> List[dict]:
+    """
+    주별/월별 통계 행 (전체 및 결제 타입별)
+    """
+    return PeriodAggregator().add(columns).rows()
@@ -0,0 +1,54 @@
+from typing import Dict, Iterable, Tuple
+from collections import defaultdict
+from sqlmodel import Session, select
+
+from models.sale_daily import SaleDaily
+
+
+def apply_daily_deltas(
+    session: Session,
+    deltas: Iterable[Tuple[str, str, int, int]],
+) -> None:
+    """
+    판매 변경분을 일별 롤업(sale_daily)에 반영
+
+    커밋은 호출자가 판매 변경과 같은 트랜잭션에서 수행한다.
+
+    Args:
+        session: DB 세션
+        deltas: (input_date, payment_type, 금액 변화량, 건수 변화량) 목록
+    """
+    merged: Dict[Tuple[str, str], Dict[str, int]] = defaultdict(lambda: {'total': 0, 'count': 0})
+    for input_date, payment_type, amount_delta, count_delta in deltas:
+        merged[(input_date, payment_type)]['total'] += amount_delta
+        merged[(input_date, payment_type)]['count'] += count_delta
+
+    merged = {key: data for key, data in merged.items() if data['total'] or data['count']}
+    if not merged:
+        return
+
+    # 영향받는 날짜의 기존 롤업을 한 번에 조회
+    dates = {input_date for input_date, _ in merged}
+    existing = {
+        (daily.input_date, daily.payment_type): daily
+        for daily in session.exec(select(SaleDaily).where(SaleDaily.input_date.in_(dates))).all()
+    }
+
+    for (input_date, payment_type), data in merged.items():
+        daily = existing.get((input_date, payment_type))
+        is_new = daily is None
+        if is_new:
+            if data['count'] <= 0:
+                # 롤업에 없는 날짜의 차감은 백필로만 복구 가능
+                continue
+            daily = SaleDaily(input_date=input_date, payment_type=payment_type)
+
+        daily.total_amount += data['total']
+        daily.transaction_count += data['count']
+
+        if daily.transaction_count <= 0:
+            if not is_new:
+                session.delete(daily)
+            continue
+
+        session.add(daily)
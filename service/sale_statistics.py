@@ -1,185 +1,592 @@
-from typing import List, Optional, Dict, Tuple
-from datetime import datetime, timedelta, timezone
+import os
+import threading
+from typing import List, Optional, Dict, Tuple, Iterable, Iterator, Callable, NamedTuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
 from collections import defaultdict
-from sqlmodel import Session, select, delete
+from multiprocessing import get_context
+from fastapi import HTTPException
+from core.data_version import bump_data_version, get_data_version
+from core.db import read_engine, upsert_insert
+from core.engine import begin_immediate, create_app_engine, is_memory_sqlite
+from sqlalchemy import Engine, and_, case, insert, literal, or_, union_all
+from sqlmodel import Session, select, delete, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 from models.sale_statistics import (
     SaleStatistics,
+    period_start_day,
+    period_end_day,
+    SaleStatisticsStaging,
+    SaleStatisticsDirty,
     SaleStatisticsResponse,
     WeatherMonthlySales,
     WeatherMonthlySalesTrend,
     DailySalesByPaymentType,
 )
-from models.sale import Sale
-from models.weather import Weather
-
+from models.sale import Sale, sale_input_day
+from models.sale_daily import SaleDaily, sale_daily_input_day
+from models.weather import Weather, weather_day
+from service.sale_aggregation import PeriodAggregator, daily_columns, daily_rows, iter_column_chunks
+from utils.calendar import day_key, day_str, month_bounds, week_bounds
+from utils.export import EXPORT_CSV, iter_export
+from utils.json_response import dump_columns, dump_records, dumps
+
+ProgressCallback = Callable[[float], None]
+
+# 집계 중 데이터가 바뀌었을 때 다시 집계하는 최대 횟수
+RECOMPUTE_MAX_ATTEMPTS = 3
+# 응답 JSON 필드 순서 (응답 모델과 같은 스키마)
+STATISTICS_FIELDS = tuple(SaleStatisticsResponse.model_fields)
+DAILY_FIELDS = tuple(DailySalesByPaymentType.model_fields)
+# 재계산 집계 프로세스 수 (1이면 현재 프로세스에서 순서대로 집계)
+RECOMPUTE_WORKERS = int(os.getenv("RECOMPUTE_WORKERS", "1"))
+# 집계 프로세스 수 상한 (프로세스마다 앱 모듈과 읽기 연결을 따로 가짐)
+RECOMPUTE_MAX_WORKERS = 32
+# 프로세스당 샤드 수 (기간별 판매 수 차이를 고르게 분산)
+SHARDS_PER_WORKER = 4
+# 재계산 범위의 판매가 이보다 적으면 workers와 관계없이 순서대로 집계 (샤드 전송/병합 비용이 더 큼)
+RECOMPUTE_PARALLEL_MIN_ROWS = int(os.getenv("RECOMPUTE_PARALLEL_MIN_ROWS", "200000"))
+
+
+def apply_sale_deltas(
+    session: Session,
+    deltas: Iterable[Tuple[str, str, int, int]],
+) -> None:
+    """
+    판매 변경분을 주별/월별 통계(전체 및 결제 타입별)에 반영
 
-def _get_monday_of_week(date_str: str) -> str:
-    date = datetime.strptime(date_str, "%Y-%m-%d")
-    weekday = date.weekday()
+    커밋은 호출자가 판매 변경과 같은 트랜잭션에서 수행한다.
 
-    if weekday == 6:  # 일요일
-        monday = date + timedelta(days=1)
-    else:
-        monday = date - timedelta(days=weekday)
+    Args:
+        session: DB 세션
+        deltas: (input_date, payment_type, 금액 변화량, 건수 변화량) 목록
+    """
+    # (period_type, 시작 일 번호, 종료 일 번호, 결제 타입) -> 변화량
+    buckets: Dict[Tuple[str, int, int, str], Dict[str, int]] = defaultdict(lambda: {'total': 0, 'count': 0})
+
+    for input_date, payment_type, amount_delta, count_delta in deltas:
+        day = day_key(input_date)
+        periods = (
+            ("week", *week_bounds(day)),
+            ("month", *month_bounds(day)),
+        )
+        for period_type, start, end in periods:
+            for target in ("all", payment_type):
+                bucket = buckets[(period_type, start, end, target)]
+                bucket['total'] += amount_delta
+                bucket['count'] += count_delta
+
+    buckets = {key: data for key, data in buckets.items() if data['total'] or data['count']}
+    if not buckets:
+        return
 
-    return monday.strftime("%Y-%m-%d")
+    # 영향받는 기간의 기존 통계를 한 번에 조회
+    starts = {start for _, start, _, _ in buckets}
+    existing = {
+        (stat.period_type, start, stat.payment_type): stat
+        for stat, start in session.exec(
+            select(SaleStatistics, period_start_day).where(period_start_day.in_(starts))
+        ).all()
+    }
 
+    now = datetime.now(timezone.utc)
 
-def _get_saturday_of_week(monday_str: str) -> str:
-    monday = datetime.strptime(monday_str, "%Y-%m-%d")
-    saturday = monday + timedelta(days=5)
-    return saturday.strftime("%Y-%m-%d")
+    for (period_type, start, end, payment_type), data in buckets.items():
+        stat = existing.get((period_type, start, payment_type))
 
+        if stat is None:
+            if data['count'] <= 0:
+                # 집계된 적 없는 기간의 차감은 재계산으로만 복구 가능
+                continue
+            stat = SaleStatistics(
+                period_type=period_type,
+                period_start=day_str(start),
+                period_end=day_str(end),
+                payment_type=payment_type,
+                total_amount=0,
+                transaction_count=0,
+                avg_amount=0,
+                created_at=now,
+            )
 
-def _get_month_range(date_str: str) -> Tuple[str, str]:
-    date = datetime.strptime(date_str, "%Y-%m-%d")
-    year = date.year
-    month = date.month
+        stat.total_amount += data['total']
+        stat.transaction_count += data['count']
 
-    first_day = datetime(year, month, 1).strftime("%Y-%m-%d")
+        if stat.transaction_count <= 0:
+            if stat.id is not None:
+                session.delete(stat)
+            continue
 
-    if month == 12:
-        last_day = datetime(year, 12, 31).strftime("%Y-%m-%d")
-    else:
-        next_month = datetime(year, month + 1, 1)
-        last_day = (next_month - timedelta(days=1)).strftime("%Y-%m-%d")
+        stat.avg_amount = stat.total_amount / stat.transaction_count
+        stat.updated_at = now
+        session.add(stat)
 
-    return first_day, last_day
 
+def _write_staging(session: Session, statistics: List[dict]) -> None:
+    # 다른 작업이 남긴 행이 섞이지 않도록 비우고 채운다 (커밋은 _swap_staging이 수행)
+    session.exec(delete(SaleStatisticsStaging))
+    if statistics:
+        session.exec(insert(SaleStatisticsStaging.__table__), params=statistics)
 
-def _normalize_date(date_str: str) -> str:
-    if "-" in date_str:
-        return date_str
-    return datetime.strptime(date_str, "%Y%m%d").strftime("%Y-%m-%d")
 
+class PeriodBounds(NamedTuple):
+    # 모두 일 번호 (utils/calendar.py)
+    week_start: int   # 첫 주 월요일
+    week_end: int     # 마지막 주 월요일
+    month_start: int  # 첫 달 1일
+    month_end: int    # 마지막 달 1일
+    read_start: int   # 재집계할 판매 날짜 범위
+    read_end: int
 
-def _month_key(date_str: str) -> str:
-    normalized = _normalize_date(date_str)
-    return normalized[:7]
 
+def _period_bounds(start_date: str, end_date: str) -> PeriodBounds:
+    """
+    [start_date, end_date]와 겹치는 주/월 기간과 이를 다시 집계하는 데 필요한 판매 날짜 범위
+    """
+    week_start, _ = week_bounds(day_key(start_date))
+    week_end, last_saturday = week_bounds(day_key(end_date))
+    month_start, _ = month_bounds(day_key(start_date))
+    last_month_start, last_month_end = month_bounds(day_key(end_date))
+
+    return PeriodBounds(
+        week_start=week_start,
+        week_end=week_end,
+        month_start=month_start,
+        month_end=last_month_start,
+        # 주는 전주 일요일 ~ 토요일을 포함
+        read_start=min(week_start - 1, month_start),
+        read_end=max(last_saturday, last_month_end),
+    )
 
-def recompute_statistics(session: Session) -> None:
-    sales = session.exec(select(Sale).order_by(Sale.input_date)).all()
 
-    session.exec(delete(SaleStatistics))
+def _in_bounds(row: dict, bounds: PeriodBounds) -> bool:
+    start = day_key(row['period_start'])
+    if row['period_type'] == "week":
+        return bounds.week_start <= start <= bounds.week_end
+    return bounds.month_start <= start <= bounds.month_end
 
-    if not sales:
-        session.commit()
-        return
 
-    weekly_all: Dict[Tuple[str, str], Dict[str, int]] = defaultdict(lambda: {'total': 0, 'count': 0})
-    weekly_by_type: Dict[Tuple[str, str], Dict[str, Dict[str, int]]] = defaultdict(
-        lambda: defaultdict(lambda: {'total': 0, 'count': 0})
+def _bounds_clause(bounds: PeriodBounds):
+    return or_(
+        and_(
+            SaleStatistics.period_type == "week",
+            period_start_day.between(bounds.week_start, bounds.week_end),
+        ),
+        and_(
+            SaleStatistics.period_type == "month",
+            period_start_day.between(bounds.month_start, bounds.month_end),
+        ),
     )
-    monthly_all: Dict[Tuple[str, str], Dict[str, int]] = defaultdict(lambda: {'total': 0, 'count': 0})
-    monthly_by_type: Dict[Tuple[str, str], Dict[str, Dict[str, int]]] = defaultdict(
-        lambda: defaultdict(lambda: {'total': 0, 'count': 0})
+
+
+class StatisticsConflictError(Exception):
+    """재계산하는 동안 판매가 계속 바뀌어 스테이징 통계로 교체하지 못함"""
+
+
+def _swap_staging(
+    session: Session,
+    bounds: Optional[PeriodBounds],
+    version: int,
+    statistics: List[dict],
+) -> bool:
+    """
+    statistics를 스테이징 테이블에 쓰고 통계를 교체 (집계 전에 읽은 데이터 버전이 그대로일 때만)
+
+    쓰기 잠금을 먼저 잡고 버전을 확인하므로, 확인 후 교체가 끝날 때까지 다른 쓰기(다른 프로세스 포함)가
+    커밋되지 않는다. 버전이 바뀌었으면 그 변경의 통계 반영분을 덮어쓰지 않도록 교체하지 않고 False를 반환한다.
+    스테이징 쓰기, 삭제와 복사를 한 트랜잭션에서 수행하므로 다른 워커/CLI의 재계산이 스테이징 행을 바꿔치기할 수 없고,
+    조회 측에는 이전/새 통계 중 하나만 보인다.
+    """
+    # 집계 중 열린 읽기 트랜잭션을 끝내고 쓰기 잠금부터 잡는다
+    session.commit()
+    begin_immediate(session.connection())
+    if get_data_version(session, for_update=True) != version:
+        session.rollback()
+        return False
+
+    _write_staging(session, statistics)
+
+    # 일 번호 생성 열은 복사하지 않음
+    columns = [
+        column.name
+        for column in SaleStatistics.__table__.columns
+        if column.name != "id" and column.computed is None
+    ]
+    staging = SaleStatisticsStaging.__table__
+    if bounds:
+        session.exec(delete(SaleStatistics).where(_bounds_clause(bounds)))
+    else:
+        session.exec(delete(SaleStatistics))
+    session.exec(
+        insert(SaleStatistics.__table__).from_select(
+            columns, select(*[staging.c[name] for name in columns])
+        )
     )
+    session.exec(delete(SaleStatisticsStaging))
+    bump_data_version(session)
+    session.commit()
+    return True
 
-    for sale in sales:
-        monday = _get_monday_of_week(sale.input_date)
-        saturday = _get_saturday_of_week(monday)
-        week_key = (monday, saturday)
 
-        weekly_all[week_key]['total'] += sale.amount
-        weekly_all[week_key]['count'] += 1
-        weekly_by_type[week_key][sale.payment_type]['total'] += sale.amount
-        weekly_by_type[week_key][sale.payment_type]['count'] += 1
+def _sales_query(bounds: Optional[PeriodBounds]):
+    # 판매 1행 = 1건
+    query = select(sale_input_day, Sale.payment_type, Sale.amount, literal(1))
+    if bounds:
+        query = query.where(sale_input_day.between(bounds.read_start, bounds.read_end))
+    return query
 
-        month_start, month_end = _get_month_range(sale.input_date)
-        month_key = (month_start, month_end)
 
-        monthly_all[month_key]['total'] += sale.amount
-        monthly_all[month_key]['count'] += 1
-        monthly_by_type[month_key][sale.payment_type]['total'] += sale.amount
-        monthly_by_type[month_key][sale.payment_type]['count'] += 1
+def _aggregate(session: Session, bounds: Optional[PeriodBounds]) -> List[dict]:
+    aggregator = PeriodAggregator()
+    for columns in iter_column_chunks(session, _sales_query(bounds)):
+        aggregator.add(columns)
+    statistics = aggregator.rows()
+    if bounds:
+        statistics = [row for row in statistics if _in_bounds(row, bounds)]
+    return statistics
 
-    now = datetime.now(timezone.utc)
-    statistics: List[SaleStatistics] = []
-
-    for (start, end), data in weekly_all.items():
-        avg = data['total'] / data['count'] if data['count'] > 0 else 0
-        statistics.append(
-            SaleStatistics(
-                period_type="week",
-                period_start=start,
-                period_end=end,
-                payment_type="all",
-                total_amount=data['total'],
-                transaction_count=data['count'],
-                avg_amount=avg,
-                created_at=now,
-                updated_at=now,
-            )
+
+def _shard_bounds(span_start: int, span_end: int, shards: int) -> List[PeriodBounds]:
+    """
+    [span_start, span_end] 구간을 월 경계에서 나눈 샤드
+
+    샤드는 시작일(주는 월요일, 월은 1일)이 자기 구간에 있는 통계만 맡으므로 결과가 겹치지 않는다.
+    맡은 주의 전주 일요일 ~ 토요일과 맡은 달 전체를 읽는다.
+    """
+    months = [span_start]
+    while month_bounds(months[-1])[1] < span_end:
+        months.append(month_bounds(months[-1])[1] + 1)
+
+    shards = max(1, min(shards, len(months)))
+    starts = [months[len(months) * index // shards] for index in range(shards)]
+    ends = [start - 1 for start in starts[1:]] + [span_end]
+    return [
+        PeriodBounds(
+            week_start=start,
+            week_end=end,
+            month_start=start,
+            month_end=end,
+            read_start=start - 1,
+            read_end=max(end + 5, month_bounds(end)[1]),
         )
+        for start, end in zip(starts, ends)
+    ]
 
-    for (start, end), types in weekly_by_type.items():
-        for payment_type, data in types.items():
-            avg = data['total'] / data['count'] if data['count'] > 0 else 0
-            statistics.append(
-                SaleStatistics(
-                    period_type="week",
-                    period_start=start,
-                    period_end=end,
-                    payment_type=payment_type,
-                    total_amount=data['total'],
-                    transaction_count=data['count'],
-                    avg_amount=avg,
-                    created_at=now,
-                    updated_at=now,
-                )
-            )
 
-    for (start, end), data in monthly_all.items():
-        avg = data['total'] / data['count'] if data['count'] > 0 else 0
-        statistics.append(
-            SaleStatistics(
-                period_type="month",
-                period_start=start,
-                period_end=end,
-                payment_type="all",
-                total_amount=data['total'],
-                transaction_count=data['count'],
-                avg_amount=avg,
-                created_at=now,
-                updated_at=now,
+# 작업 프로세스의 읽기 전용 엔진 (DB URL별 하나)
+_shard_engines: Dict[str, Engine] = {}
+
+# 프로세스 수별 집계 프로세스 풀 (처음 쓸 때 만들고 앱 종료 시 shutdown_recompute_executors로 정리)
+_recompute_executors: Dict[int, ProcessPoolExecutor] = {}
+_recompute_executors_lock = threading.Lock()
+
+
+def get_recompute_executor(workers: int) -> ProcessPoolExecutor:
+    """
+    workers개 프로세스의 집계 풀 (프로세스 안에서 재사용)
+
+    spawn 프로세스는 시작할 때마다 앱 모듈을 다시 import하므로 재계산마다 만들지 않는다.
+    """
+    with _recompute_executors_lock:
+        executor = _recompute_executors.get(workers)
+        if executor is None:
+            executor = _recompute_executors[workers] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=get_context("spawn")
             )
+        return executor
+
+
+def shutdown_recompute_executors() -> None:
+    """
+    집계 프로세스 풀 종료 (앱 종료 시)
+    """
+    with _recompute_executors_lock:
+        executors = list(_recompute_executors.values())
+        _recompute_executors.clear()
+    for executor in executors:
+        executor.shutdown(cancel_futures=True)
+
+
+def _aggregate_shard(url: str, bounds: PeriodBounds) -> List[dict]:
+    # 작업 프로세스에서 실행: 자기 읽기 연결로 샤드 하나를 집계
+    engine = _shard_engines.get(url)
+    if engine is None:
+        engine = _shard_engines[url] = create_app_engine(url, read_only=True)
+    with Session(engine) as session:
+        return _aggregate(session, bounds)
+
+
+def _aggregate_parallel(
+    session: Session,
+    bounds: Optional[PeriodBounds],
+    executor: ProcessPoolExecutor,
+    workers: int,
+    progress: Optional[ProgressCallback] = None,
+) -> List[dict]:
+    """
+    샤드별 집계 결과를 합쳐 순차 집계(_aggregate)와 같은 행을 같은 순서로 반환
+    """
+    if bounds:
+        span_start = min(bounds.week_start, bounds.month_start)
+        span_end = max(bounds.week_end, bounds.month_end)
+    else:
+        first_day, last_day = session.exec(select(func.min(sale_input_day), func.max(sale_input_day))).one()
+        if first_day is None:
+            return []
+        # 첫 판매가 속한 주/월과 마지막 판매가 속한 주(일요일이면 다음 월요일)까지
+        span_start = min(week_bounds(first_day)[0], month_bounds(first_day)[0])
+        span_end = max(week_bounds(last_day)[0], last_day)
+
+    url = session.get_bind().url.render_as_string(hide_password=False)
+    futures = [
+        executor.submit(_aggregate_shard, url, shard)
+        for shard in _shard_bounds(span_start, span_end, workers * SHARDS_PER_WORKER)
+    ]
+    statistics: List[dict] = []
+    for done, future in enumerate(as_completed(futures), start=1):
+        statistics.extend(row for row in future.result() if not bounds or _in_bounds(row, bounds))
+        if progress:
+            progress(0.4 * done / len(futures))
+
+    # 순차 집계와 같은 정렬/생성 시각
+    statistics.sort(key=lambda row: (row['period_type'] != "week", row['period_start'], row['payment_type']))
+    now = datetime.now(timezone.utc)
+    for row in statistics:
+        row['created_at'] = row['updated_at'] = now
+    return statistics
+
+
+def _parallel_executor(
+    session: Session,
+    bounds: Optional[PeriodBounds],
+    workers: int,
+    parallel_min_rows: int,
+) -> Optional[ProcessPoolExecutor]:
+    # 병렬 집계에 쓸 풀 (순서대로 집계해야 하면 None)
+    # 메모리 DB는 다른 프로세스에서 열 수 없다
+    if workers < 2 or is_memory_sqlite(str(session.get_bind().url)):
+        return None
+    if parallel_min_rows > 0:
+        query = select(func.count()).select_from(Sale)
+        if bounds:
+            query = query.where(sale_input_day.between(bounds.read_start, bounds.read_end))
+        if session.exec(query).one() < parallel_min_rows:
+            return None
+    return get_recompute_executor(workers)
+
+
+def _recompute_workers(workers: Optional[int]) -> int:
+    # 집계 프로세스 수 (미지정 시 RECOMPUTE_WORKERS), 범위 밖이면 ValueError
+    if workers is None:
+        workers = RECOMPUTE_WORKERS
+    if not 1 <= workers <= RECOMPUTE_MAX_WORKERS:
+        raise ValueError(f"workers (RECOMPUTE_WORKERS) must be between 1 and {RECOMPUTE_MAX_WORKERS}, got {workers}")
+    return workers
+
+
+def recompute_statistics(
+    session: Session,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    progress: Optional[ProgressCallback] = None,
+    workers: Optional[int] = None,
+    parallel_min_rows: Optional[int] = None,
+) -> int:
+    """
+    통계 재계산
+
+    날짜 범위를 지정하면 그 범위와 겹치는 주/월 통계만 다시 만든다.
+    집계는 잠금 없이 하고, 스테이징 테이블 쓰기와 교체는 쓰기 잠금을 잡은 한 트랜잭션에서 하므로
+    재계산 중에도 조회 측에는 기존 통계가 그대로 보이고, 여러 프로세스의 재계산이 겹쳐도 서로의 스테이징 행을 쓰지 않는다.
+    집계를 시작한 뒤 판매/통계 변경이 커밋되었으면(DB의 데이터 버전으로 확인) 다시 집계하고,
+    RECOMPUTE_MAX_ATTEMPTS번 모두 그랬으면 StatisticsConflictError를 발생시킨다.
+
+    workers가 2 이상이고 범위의 판매가 parallel_min_rows 이상이면 월 단위 샤드를
+    프로세스 풀(get_recompute_executor)에서 집계한 뒤 합친다. (결과는 순차 집계와 같다)
+
+    Args:
+        session: DB 세션
+        start_date: 재계산 시작 날짜 (YYYY-MM-DD, end_date와 함께 지정)
+        end_date: 재계산 종료 날짜 (YYYY-MM-DD)
+        progress: 진행률(0.0~1.0) 콜백
+        workers: 집계 프로세스 수 (미지정 시 RECOMPUTE_WORKERS, 1 ~ RECOMPUTE_MAX_WORKERS가 아니면 ValueError)
+        parallel_min_rows: 병렬 집계할 최소 판매 수 (미지정 시 RECOMPUTE_PARALLEL_MIN_ROWS, 0이면 항상 병렬)
+
+    Returns:
+        생성된 통계 행 수
+    """
+    if (start_date is None) != (end_date is None):
+        raise ValueError("start_date and end_date must be given together")
+    bounds = _period_bounds(start_date, end_date) if start_date else None
+
+    workers = _recompute_workers(workers)
+    if parallel_min_rows is None:
+        parallel_min_rows = RECOMPUTE_PARALLEL_MIN_ROWS
+    executor = _parallel_executor(session, bounds, workers, parallel_min_rows)
+
+    for _ in range(RECOMPUTE_MAX_ATTEMPTS):
+        # 집계 전에 읽은 버전: 이후 커밋된 변경은 집계에 빠졌을 수 있다
+        version = get_data_version(session)
+        if executor:
+            statistics = _aggregate_parallel(session, bounds, executor, workers, progress)
+        else:
+            statistics = _aggregate(session, bounds)
+        if progress:
+            progress(0.4)
+
+        if _swap_staging(session, bounds, version, statistics):
+            break
+    else:
+        raise StatisticsConflictError(
+            f"sales kept changing during {RECOMPUTE_MAX_ATTEMPTS} recompute attempts; statistics were not replaced"
         )
 
-    for (start, end), types in monthly_by_type.items():
-        for payment_type, data in types.items():
-            avg = data['total'] / data['count'] if data['count'] > 0 else 0
-            statistics.append(
-                SaleStatistics(
-                    period_type="month",
-                    period_start=start,
-                    period_end=end,
-                    payment_type=payment_type,
-                    total_amount=data['total'],
-                    transaction_count=data['count'],
-                    avg_amount=avg,
-                    created_at=now,
-                    updated_at=now,
-                )
-            )
+    if progress:
+        progress(1.0)
+    return len(statistics)
+
 
-    session.add_all(statistics)
+def mark_dirty_dates(session: Session, dates: Iterable[str]) -> None:
+    """
+    판매가 바뀐 날짜를 재계산 대상으로 기록 (커밋은 호출자가 수행)
+    """
+    now = datetime.now(timezone.utc)
+    rows = [{"input_date": input_date, "marked_at": now} for input_date in set(dates)]
+    if not rows:
+        return
+    stmt = upsert_insert(session, SaleStatisticsDirty.__table__).on_conflict_do_nothing(
+        index_elements=["input_date"]
+    )
+    session.exec(stmt, params=rows)
+
+
+def recompute_dirty_statistics(
+    session: Session,
+    progress: Optional[ProgressCallback] = None,
+    workers: Optional[int] = None,
+    parallel_min_rows: Optional[int] = None,
+) -> int:
+    """
+    변경 기록이 있는 날짜가 속한 월(및 겹치는 주)만 재계산
+
+    연속된 월은 하나의 범위로 묶어 처리하고, 처리한 날짜의 기록만 지운다.
+    병렬 집계 조건은 범위마다 recompute_statistics와 같이 판단하며, 프로세스 풀은 범위 사이에 재사용된다.
+
+    Returns:
+        생성된 통계 행 수
+    """
+    workers = _recompute_workers(workers)
+    dirty_dates = session.exec(
+        select(SaleStatisticsDirty.input_date).order_by(SaleStatisticsDirty.input_date)
+    ).all()
+    if not dirty_dates:
+        return 0
+
+    # 변경된 월을 연속 구간으로 묶기 (일 번호)
+    month_ranges: List[List[int]] = []
+    for input_date in dirty_dates:
+        month_start, month_end = month_bounds(day_key(input_date))
+        if month_ranges and month_ranges[-1][1] >= month_start:
+            continue
+        if month_ranges and month_ranges[-1][1] == month_start - 1:
+            month_ranges[-1][1] = month_end
+        else:
+            month_ranges.append([month_start, month_end])
+
+    rows = 0
+    for index, (start, end) in enumerate(month_ranges):
+        rows += recompute_statistics(
+            session, day_str(start), day_str(end), workers=workers, parallel_min_rows=parallel_min_rows
+        )
+        if progress:
+            progress((index + 1) / len(month_ranges))
+
+    session.exec(delete(SaleStatisticsDirty).where(SaleStatisticsDirty.input_date.in_(dirty_dates)))
     session.commit()
+    return rows
+
+
+def _parse_day(value: str) -> int:
+    # 조회 조건 날짜 -> 일 번호
+    try:
+        return day_key(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {value}")
+
+
+def _summary_part(summary, index: int):
+    # 'sky / rain' 형식 요약에서 index번째 항목 (구분자가 없으면 요약 전체)
+    first_sep = func.instr(summary, "/")
+    head = func.trim(func.substr(summary, 1, first_sep - 1))
+    rest = func.substr(summary, first_sep + 1)
+    rest_sep = func.instr(rest, "/")
+    second = case(
+        (rest_sep > 0, func.trim(func.substr(rest, 1, rest_sep - 1))),
+        else_=func.trim(rest),
+    )
+    return case((first_sep > 0, head if index == 0 else second), else_=summary)
 
 
-def _group_summary(summary: str, group_by: Optional[str]) -> Optional[str]:
-    if not summary:
-        return None
-    if not group_by:
-        return summary
-    parts = [part.strip() for part in summary.split("/")]
+def _group_summary(summary, group_by: Optional[str]):
     if group_by == "sky":
-        return parts[0] if parts else summary
+        return _summary_part(summary, 0)
     if group_by == "rain":
-        return parts[1] if len(parts) > 1 else summary
+        return _summary_part(summary, 1)
     return summary
 
 
+def _weather_trend_groups(
+    session: Session,
+    summary: Optional[str] = None,
+    summary_sky: Optional[str] = None,
+    summary_rain: Optional[str] = None,
+    group_by: Optional[str] = None,
+) -> List[dict]:
+    group_targets = ["sky", "rain"] if group_by in (None, "both") else [group_by]
+    month = func.substr(SaleDaily.input_date, 1, 7)
+    # weather.date는 YYYY-MM-DD 또는 YYYYMMDD이므로 일 번호로 조인
+    same_date = weather_day == sale_daily_input_day
+
+    # 분류 기준별 (요약, 월) 매출 합계를 하나의 쿼리로 집계
+    queries = []
+    for target in group_targets:
+        grouped_summary = _group_summary(Weather.summary, target)
+        query = (
+            select(
+                literal(target).label("category_type"),
+                grouped_summary.label("summary"),
+                month.label("month"),
+                func.sum(SaleDaily.total_amount).label("total_amount"),
+            )
+            .select_from(SaleDaily)
+            .join(Weather, same_date)
+            .where(Weather.summary.is_not(None), Weather.summary != "")
+            .where(grouped_summary != "")
+            .group_by(grouped_summary, month)
+        )
+        if summary:
+            query = query.where(grouped_summary == summary)
+        if target == "sky" and summary_sky:
+            query = query.where(grouped_summary == summary_sky)
+        if target == "rain" and summary_rain:
+            query = query.where(grouped_summary == summary_rain)
+        queries.append(query)
+
+    trend = union_all(*queries).subquery()
+    rows = session.exec(
+        select(trend.c.category_type, trend.c.summary, trend.c.month, trend.c.total_amount)
+        .order_by(trend.c.category_type, trend.c.summary, trend.c.month)
+    ).all()
+
+    # WeatherMonthlySalesTrend와 같은 구조의 dict
+    groups: List[dict] = []
+    for category_type, weather_summary, month_key, total in rows:
+        if not groups or (groups[-1]["category_type"], groups[-1]["summary"]) != (category_type, weather_summary):
+            groups.append({"category_type": category_type, "summary": weather_summary, "data": []})
+        groups[-1]["data"].append({"month": month_key, "total_amount": total})
+    return groups
+
+
 def get_weather_monthly_sales_trend(
     session: Session,
     summary: Optional[str] = None,
@@ -187,54 +594,50 @@ def get_weather_monthly_sales_trend(
     summary_rain: Optional[str] = None,
     group_by: Optional[str] = None,
 ) -> List[WeatherMonthlySalesTrend]:
-    weather_map = {
-        _normalize_date(weather.date): weather.summary
-        for weather in session.exec(select(Weather)).all()
-        if weather.summary
-    }
+    return [
+        WeatherMonthlySalesTrend(
+            category_type=group["category_type"],
+            summary=group["summary"],
+            data=[WeatherMonthlySales(**point) for point in group["data"]],
+        )
+        for group in _weather_trend_groups(session, summary, summary_sky, summary_rain, group_by)
+    ]
 
-    sales = session.exec(select(Sale).order_by(Sale.input_date)).all()
-    monthly_sales: Dict[str, Dict[str, Dict[str, int]]] = defaultdict(
-        lambda: defaultdict(lambda: defaultdict(int))
-    )
-    group_targets = ["sky", "rain"] if group_by in (None, "both") else [group_by]
 
-    for sale in sales:
-        sale_date = _normalize_date(sale.input_date)
-        weather_summary = weather_map.get(sale_date)
-        if not weather_summary:
-            continue
-        month = _month_key(sale_date)
-        for target in group_targets:
-            grouped_summary = _group_summary(weather_summary, target)
-            if not grouped_summary:
-                continue
-            if summary and grouped_summary != summary:
-                continue
-            if target == "sky" and summary_sky and grouped_summary != summary_sky:
-                continue
-            if target == "rain" and summary_rain and grouped_summary != summary_rain:
-                continue
-            monthly_sales[target][grouped_summary][month] += sale.amount
-
-    results: List[WeatherMonthlySalesTrend] = []
-    for category_type in sorted(monthly_sales.keys()):
-        summaries = monthly_sales[category_type]
-        for weather_summary in sorted(summaries.keys()):
-            month_map = summaries[weather_summary]
-            months = [
-                WeatherMonthlySales(month=month, total_amount=total)
-                for month, total in sorted(month_map.items())
-            ]
-            results.append(
-                WeatherMonthlySalesTrend(
-                    category_type=category_type,
-                    summary=weather_summary,
-                    data=months,
-                )
-            )
+def get_weather_monthly_sales_trend_json(
+    session: Session,
+    summary: Optional[str] = None,
+    summary_sky: Optional[str] = None,
+    summary_rain: Optional[str] = None,
+    group_by: Optional[str] = None,
+) -> bytes:
+    """
+    get_weather_monthly_sales_trend 결과를 모델 생성 없이 JSON 바이트로 반환
+    """
+    return dumps(_weather_trend_groups(session, summary, summary_sky, summary_rain, group_by))
+
+
+def _daily_query(start_date: Optional[str], end_date: Optional[str]):
+    # 일별 롤업의 (날짜, payment_type, 금액) - 롤업은 (날짜, 결제 타입)마다 한 행
+    query = select(SaleDaily.input_date, SaleDaily.payment_type, SaleDaily.total_amount)
 
-    return results
+    if start_date:
+        query = query.where(sale_daily_input_day >= _parse_day(start_date))
+    if end_date:
+        query = query.where(sale_daily_input_day <= _parse_day(end_date))
+    return query
+
+
+def _daily_rows(
+    session: Session,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> List[Tuple[str, Dict[str, int], int]]:
+    # sale_daily 행을 (날짜, 결제 타입) 순으로 읽어 날짜별로 묶기만 한다 (다시 집계하지 않음)
+    query = _daily_query(start_date, end_date).order_by(
+        SaleDaily.input_date, SaleDaily.payment_type
+    )
+    return daily_rows(session.connection().execute(query).all())
 
 
 def get_daily_sales_statistics(
@@ -242,31 +645,68 @@ def get_daily_sales_statistics(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
 ) -> List[DailySalesByPaymentType]:
-    query = select(Sale)
+    return [
+        DailySalesByPaymentType(
+            date=date,
+            payment_types=payment_types,
+            total_amount=total_amount,
+        )
+        for date, payment_types, total_amount in _daily_rows(session, start_date, end_date)
+    ]
 
+
+def get_daily_sales_statistics_json(
+    session: Session,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    columnar: bool = False,
+) -> bytes:
+    """
+    get_daily_sales_statistics 결과를 모델 생성 없이 JSON 바이트로 반환
+
+    columnar이면 날짜/합계 배열과 결제 타입 목록(한 번), 결제 타입별 금액 배열로 반환한다.
+    (그날 판매가 없는 결제 타입의 금액은 null)
+    두 형식 모두 sale_daily 롤업 행에서 바로 만들며, 열 배열은 ORM 행이나 일별 dict도 만들지 않는다.
+    """
+    if not columnar:
+        return dump_records(DAILY_FIELDS, _daily_rows(session, start_date, end_date))
+
+    rows = session.connection().execute(_daily_query(start_date, end_date)).all()
+    dates, payment_types, amounts, totals = daily_columns(rows)
+    return dumps({
+        "date": dates,
+        "payment_types": payment_types,
+        "amounts": amounts,
+        "total_amount": totals,
+    })
+
+
+def _statistics_query(
+    period_type: Optional[str] = None,
+    payment_type: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+):
+    # SaleStatisticsResponse 필드 순서대로 선택
+    query = select(*[SaleStatistics.__table__.c[name] for name in STATISTICS_FIELDS])
+
+    # 기간 타입 필터
+    if period_type:
+        query = query.where(SaleStatistics.period_type == period_type)
+
+    # 결제 타입 필터
+    if payment_type:
+        query = query.where(SaleStatistics.payment_type == payment_type)
+
+    # 날짜 범위 필터 (일 번호 비교)
     if start_date:
-        query = query.where(Sale.input_date >= start_date)
+        query = query.where(period_start_day >= _parse_day(start_date))
+
     if end_date:
-        query = query.where(Sale.input_date <= end_date)
-
-    sales = session.exec(query.order_by(Sale.input_date)).all()
-    daily_sales: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
-
-    for sale in sales:
-        daily_sales[sale.input_date][sale.payment_type] += sale.amount
-
-    results: List[DailySalesByPaymentType] = []
-    for date, payment_types in sorted(daily_sales.items()):
-        total_amount = sum(payment_types.values())
-        results.append(
-            DailySalesByPaymentType(
-                date=date,
-                payment_types=dict(payment_types),
-                total_amount=total_amount,
-            )
-        )
+        query = query.where(period_end_day <= _parse_day(end_date))
 
-    return results
+    # 정렬: 기간 시작일 기준 오름차순
+    return query.order_by(period_start_day)
 
 
 def get_statistics(
@@ -289,42 +729,29 @@ def get_statistics(
     Returns:
         통계 데이터 리스트
     """
-    query = select(SaleStatistics)
+    rows = session.exec(_statistics_query(period_type, payment_type, start_date, end_date)).all()
+    return [SaleStatisticsResponse(**dict(zip(STATISTICS_FIELDS, row))) for row in rows]
 
-    # 기간 타입 필터
-    if period_type:
-        query = query.where(SaleStatistics.period_type == period_type)
-
-    # 결제 타입 필터
-    if payment_type:
-        query = query.where(SaleStatistics.payment_type == payment_type)
-
-    # 날짜 범위 필터
-    if start_date:
-        query = query.where(SaleStatistics.period_start >= start_date)
 
-    if end_date:
-        query = query.where(SaleStatistics.period_end <= end_date)
-
-    # 정렬: 기간 시작일 기준 오름차순
-    query = query.order_by(SaleStatistics.period_start)
-
-    results = session.exec(query).all()
+def get_statistics_json(
+    session: Session,
+    period_type: Optional[str] = None,
+    payment_type: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    columnar: bool = False,
+) -> bytes:
+    """
+    get_statistics 결과를 모델 생성 없이 JSON 바이트로 반환 (API 응답용)
 
-    return [
-        SaleStatisticsResponse(
-            period_type=stat.period_type,
-            period_start=stat.period_start,
-            period_end=stat.period_end,
-            payment_type=stat.payment_type,
-            total_amount=stat.total_amount,
-            transaction_count=stat.transaction_count,
-            avg_amount=stat.avg_amount,
-            created_at=stat.created_at,
-            updated_at=stat.updated_at,
-        )
-        for stat in results
-    ]
+    columnar이면 필드별 배열로 반환하고, 결제 타입은 payment_types 목록(한 번)의 인덱스로 담는다.
+    (열 배열은 ORM 행을 거치지 않고 조회 결과 튜플에서 바로 만든다)
+    """
+    query = _statistics_query(period_type, payment_type, start_date, end_date)
+    if columnar:
+        rows = session.connection().execute(query).all()
+        return dump_columns(STATISTICS_FIELDS, rows, dictionaries={"payment_type": "payment_types"})
+    return dump_records(STATISTICS_FIELDS, session.exec(query).all())
 
 
 def get_statistics_summary(
@@ -348,3 +775,78 @@ def get_statistics_summary(
         period_type=period_type,
         payment_type=payment_type
     )
+
+
+def get_statistics_summary_json(
+    session: Session,
+    period_type: str,
+    payment_type: str = "all",
+    columnar: bool = False,
+) -> bytes:
+    return get_statistics_json(
+        session=session,
+        period_type=period_type,
+        payment_type=payment_type,
+        columnar=columnar,
+    )
+
+
+def export_statistics(
+    period_type: Optional[str] = None,
+    payment_type: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    export_format: str = EXPORT_CSV,
+    engine: Optional[Engine] = None,
+) -> Iterator[bytes]:
+    """
+    통계 데이터 내보내기 (CSV/NDJSON 스트림, 조건과 정렬은 get_statistics와 같음)
+
+    조건은 스트림을 시작하기 전에 검증하고(잘못된 날짜는 400),
+    조회는 응답을 보내는 동안 읽기 전용 연결(engine 미지정 시 read_engine)에서 청크 단위로 실행한다.
+    """
+    query = _statistics_query(period_type, payment_type, start_date, end_date)
+    return iter_export(engine or read_engine, query, STATISTICS_FIELDS, export_format)
+
+
+# 비동기 버전 (API 요청용, AsyncSession.run_sync로 동기 함수 실행). 응답 본문(JSON 바이트)을 반환한다.
+
+async def get_weather_monthly_sales_trend_json_async(
+    session: AsyncSession,
+    summary: Optional[str] = None,
+    summary_sky: Optional[str] = None,
+    summary_rain: Optional[str] = None,
+    group_by: Optional[str] = None,
+) -> bytes:
+    return await session.run_sync(
+        get_weather_monthly_sales_trend_json, summary, summary_sky, summary_rain, group_by
+    )
+
+
+async def get_daily_sales_statistics_json_async(
+    session: AsyncSession,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    columnar: bool = False,
+) -> bytes:
+    return await session.run_sync(get_daily_sales_statistics_json, start_date, end_date, columnar)
+
+
+async def get_statistics_json_async(
+    session: AsyncSession,
+    period_type: Optional[str] = None,
+    payment_type: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    columnar: bool = False,
+) -> bytes:
+    return await session.run_sync(get_statistics_json, period_type, payment_type, start_date, end_date, columnar)
+
+
+async def get_statistics_summary_json_async(
+    session: AsyncSession,
+    period_type: str,
+    payment_type: str = "all",
+    columnar: bool = False,
+) -> bytes:
+    return await session.run_sync(get_statistics_summary_json, period_type, payment_type, columnar)
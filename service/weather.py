@@ -1,98 +1,344 @@
-from typing import List
+from datetime import date, timedelta
+from math import ceil
+from typing import List, Optional, Tuple
 
 from dotenv import load_dotenv
 from fastapi import HTTPException
-from httpx import Client
-from core.db import SessionDep
-from models.weather import Weather
+from httpx import AsyncClient, Client
+from sqlmodel.ext.asyncio.session import AsyncSession
+from core.data_version import bump_data_version
+from core.db import SessionDep, upsert_insert
+from core.metrics import kma_timer
+from models.weather import Weather, weather_day
 from sqlmodel import select, update
-from models.sale import Sale
-from utils.convert import date_format_change
+from models.sale import Sale, sale_input_day, SYNC_PENDING, SYNC_DONE, SYNC_FAILED
+from utils.calendar import date_key, day_date, day_key, month_key_bounds
+from utils.weather_cache import weather_cache
 from utils.weather_classifier import *
 import os
 
 load_dotenv()
 
+KMA_API_URL = os.getenv(
+    "KMA_API_URL",
+    "http://apis.data.go.kr/1360000/AsosDalyInfoService/getWthrDataList",
+)
+KMA_STATION_ID = 108  # 서울
+KMA_NO_DATA = "03"
+KMA_MAX_ROWS = 999  # 한 페이지 최대 행 수
+KMA_PUBLISH_LAG_DAYS = 2  # 일자료가 공개되기까지 걸리는 일수
+CREATE_WEATHER_MAX_DAYS = 31  # POST /weather 한 번에 동기화할 최대 일수
+
 def create_weather(
     session: SessionDep,
 ):
-    result = session.exec(
-        select(Sale)
-        .where(Sale.sync_status == 0)
-        .order_by(Sale.input_date)
-        .limit(10)).all()
+    mark_synced_sales(session)
+    missing = find_missing_weather_dates(session, limit=CREATE_WEATHER_MAX_DAYS)
 
-    if not result:
+    if not missing:
+        session.commit()
         raise HTTPException(status_code=404, detail="Sale not found")
 
-    start_dt = date_format_change(
-        date=result[0].input_date,
-        current_form="%Y-%m-%d",
-        new_form="%Y%m%d",
-    )
+    stored: List[Weather] = []
+    for start, end in merge_date_ranges(missing):
+        response = fetch_weather_data(start.strftime("%Y%m%d"), end.strftime("%Y%m%d"))
+        stored.extend(store_weather_items(session, body_items(response)))
+
+    mark_failed_dates(session, missing, {weather.date for weather in stored})
+    bump_data_version(session)
+    session.commit()
+    return sorted(stored, key=lambda weather: weather.date)
+
+
+def _plan_weather_sync(session: SessionDep) -> List[date]:
+    # 동기화 상태 정리는 먼저 커밋
+    mark_synced_sales(session)
+    session.commit()
+    return find_missing_weather_dates(session, limit=CREATE_WEATHER_MAX_DAYS)
+
+
+def _store_weather_sync(session: SessionDep, missing: List[date], items: List[dict]) -> List[Weather]:
+    stored = store_weather_items(session, items)
+    mark_failed_dates(session, missing, {weather.date for weather in stored})
+    bump_data_version(session)
+    session.commit()
+    return stored
+
+
+async def create_weather_async(
+    session: AsyncSession,
+    client: Optional[AsyncClient] = None,
+) -> List[Weather]:
+    """
+    create_weather의 비동기 버전
+
+    DB 작업은 run_sync로 실행하고 KMA 호출은 await 한다.
+    모든 구간을 받은 뒤 한 트랜잭션으로 저장해 KMA 응답을 기다리는 동안 쓰기 잠금을 잡지 않는다.
+
+    Args:
+        client: 외부에서 주입할 AsyncClient (미지정 시 요청마다 생성)
+    """
+    missing = await session.run_sync(_plan_weather_sync)
+    if not missing:
+        raise HTTPException(status_code=404, detail="Sale not found")
+
+    http = client or AsyncClient()
+    items: List[dict] = []
+    try:
+        for start, end in merge_date_ranges(missing):
+            response = await fetch_weather_data_async(http, start.strftime("%Y%m%d"), end.strftime("%Y%m%d"))
+            items.extend(body_items(response))
+    finally:
+        if client is None:
+            await http.aclose()
 
-    end_dt = date_format_change(
-        date=result[-1].input_date,
-        current_form="%Y-%m-%d",
-        new_form="%Y%m%d",
+    stored = await session.run_sync(_store_weather_sync, missing, items)
+    return sorted(stored, key=lambda weather: weather.date)
+
+
+def find_missing_weather_dates(
+    session: SessionDep,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: Optional[int] = None,
+) -> List[date]:
+    """
+    날씨가 저장되지 않은 미동기화 판매 날짜 조회 (실패 처리된 날짜 제외)
+    """
+    # weather.date는 YYYY-MM-DD 또는 YYYYMMDD이므로 일 번호로 비교
+    weather_exists = select(Weather.date).where(weather_day == sale_input_day).exists()
+    query = (
+        select(sale_input_day)
+        .where(Sale.sync_status == SYNC_PENDING)
+        .where(~weather_exists)
+        .group_by(sale_input_day)
+        .order_by(sale_input_day)
     )
+    if start:
+        query = query.where(sale_input_day >= date_key(start))
+    if end:
+        query = query.where(sale_input_day <= date_key(end))
+    if limit:
+        query = query.limit(limit)
 
-    response = fetch_weather_data(start_dt, end_dt)
+    return [day_date(day) for day in session.exec(query).all()]
 
-    for item in response["items"]["item"]:
-        one_hour_rain = float(item["hr1MaxRn"] if item["hr1MaxRn"] !="" else 0)
-        avg_total_cloud = float(item["avgTca"] if item["avgTca"] != "" else 0)
 
-        rain_status = classify_rain(one_hour_rain)
-        summary = rain_status or classify_sky(avg_total_cloud)
+def merge_date_ranges(dates: List[date]) -> List[Tuple[date, date]]:
+    """
+    날짜 목록을 최소 개수의 연속 구간으로 병합
+    """
+    ranges: List[Tuple[date, date]] = []
+    for day in sorted(set(dates)):
+        if ranges and day - ranges[-1][1] == timedelta(days=1):
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return ranges
 
-        new_weather = Weather(
-            date = item["tm"],
-            avg_temp= float(item["avgTa"]),
-            min_temp= float(item["minTa"]),
-            max_temp= float(item["maxTa"]),
-            one_hour_rain=one_hour_rain,
-            sum_rain= float(item["sumRn"] if item["sumRn"] !="" else 0),
-            avg_humidity= float(item["avgRhm"]),
-            summary= summary
-        )
-        session.add(new_weather)
+
+def mark_synced_sales(session: SessionDep) -> None:
+    """
+    이미 날씨가 저장된 날짜의 미동기화 판매를 동기화 처리 (API 호출 없음)
+    """
+    session.exec(
+        update(Sale)
+        .where(Sale.sync_status == SYNC_PENDING)
+        .where(sale_input_day.in_(select(weather_day)))
+        .values(sync_status=SYNC_DONE)
+    )
+
+
+def mark_failed_dates(
+    session: SessionDep,
+    requested: List[date],
+    stored_dates: set,
+) -> None:
+    """
+    조회했지만 KMA에 관측값이 없던 날짜를 실패 처리
+
+    최근 날짜는 아직 자료가 공개되지 않았을 수 있으므로 제외한다.
+    stored_dates는 저장된 weather.date 값 (YYYY-MM-DD 또는 YYYYMMDD)
+    """
+    cutoff = date.today() - timedelta(days=KMA_PUBLISH_LAG_DAYS)
+    stored_days = {day_key(stored) for stored in stored_dates}
+    failed = [
+        date_key(day)
+        for day in requested
+        if day < cutoff and date_key(day) not in stored_days
+    ]
+    if failed:
         session.exec(
-            update(Sale).
-            where(Sale.input_date == item["tm"]).
-            values(sync_status=1)
+            update(Sale)
+            .where(sale_input_day.in_(failed))
+            .where(Sale.sync_status == SYNC_PENDING)
+            .values(sync_status=SYNC_FAILED)
         )
-        session.commit()
-    return read_weathers_by_input_date(session, start_dt, end_dt)
 
-def fetch_weather_data(
-    start_date: str,
-    end_date: str,
-):
-    URL = "http://apis.data.go.kr/1360000/AsosDalyInfoService/getWthrDataList"
-    http = Client()
-    service_key = os.getenv("KMA_SERVICE_KEY")
-    params = {
-        "serviceKey": service_key,
-        "numOfRows": 10,
-        "pageNo": 1,
+
+def _to_weather(item: dict) -> Weather:
+    one_hour_rain = float(item["hr1MaxRn"] if item["hr1MaxRn"] !="" else 0)
+    avg_total_cloud = float(item["avgTca"] if item["avgTca"] != "" else 0)
+
+    rain_status = classify_rain(one_hour_rain)
+    summary = rain_status or classify_sky(avg_total_cloud)
+
+    return Weather(
+        date = item["tm"],
+        avg_temp= float(item["avgTa"]),
+        min_temp= float(item["minTa"]),
+        max_temp= float(item["maxTa"]),
+        one_hour_rain=one_hour_rain,
+        sum_rain= float(item["sumRn"] if item["sumRn"] !="" else 0),
+        avg_humidity= float(item["avgRhm"]),
+        summary= summary
+    )
+
+
+def kma_params(start_date: str, end_date: str, page_no: int = 1, num_of_rows: int = 10) -> dict:
+    return {
+        "serviceKey": os.getenv("KMA_SERVICE_KEY"),
+        "numOfRows": num_of_rows,
+        "pageNo": page_no,
         "dataType": "JSON",
         "dataCd": "ASOS",
         "dateCd": "DAY",
         "startDt": start_date,
         "endDt": end_date,
-        "stnIds": 108
+        "stnIds": KMA_STATION_ID,
     }
 
-    response = http.get(URL, params=params)
-    data = response.json().get("response")
+
+def parse_kma_body(payload: dict) -> dict:
+    """
+    KMA 응답에서 body 추출 (데이터 없음(03)은 빈 body로 처리)
+    """
+    data = payload.get("response") or {}
     header = data.get("header", {})
-    if header.get("resultCode") != "00":
+    result_code = header.get("resultCode")
+    if result_code == KMA_NO_DATA:
+        return {"items": {"item": []}, "totalCount": 0}
+    if result_code != "00":
         raise Exception("No weather data found")
+    return data.get("body", {})
+
+
+def body_items(body: dict) -> List[dict]:
+    items = body.get("items") or {}
+    item = items.get("item") or []
+    return item if isinstance(item, list) else [item]
 
-    body = data.get("body", {})
+
+def is_final_range(params: dict) -> bool:
+    """
+    공개가 끝나 더 이상 바뀌지 않는 기간인지 (캐시 저장 가능 여부)
+    """
+    return day_key(params["endDt"]) < date_key(date.today() - timedelta(days=KMA_PUBLISH_LAG_DAYS))
+
+
+def _fetch_page(http: Client, params: dict) -> dict:
+    cached = weather_cache.get(params)
+    if cached is not None:
+        return cached
+
+    with kma_timer() as call:
+        response = http.get(KMA_API_URL, params=params)
+        call["status"] = response.status_code
+    body = parse_kma_body(response.json())
+    if is_final_range(params):
+        weather_cache.put(params, body)
+    return body
+
+
+def _num_of_rows(start_date: str, end_date: str) -> int:
+    days = day_key(end_date) - day_key(start_date) + 1
+    return max(1, min(days, KMA_MAX_ROWS))
+
+
+def fetch_weather_data(
+    start_date: str,
+    end_date: str,
+):
+    http = Client()
+    num_of_rows = _num_of_rows(start_date, end_date)
+
+    # totalCount 기준으로 모든 페이지를 읽어 하나의 body로 합침
+    body = _fetch_page(http, kma_params(start_date, end_date, 1, num_of_rows))
+    items = list(body_items(body))
+    total_pages = ceil(int(body.get("totalCount") or 0) / num_of_rows)
+    for page_no in range(2, total_pages + 1):
+        page = _fetch_page(http, kma_params(start_date, end_date, page_no, num_of_rows))
+        items.extend(body_items(page))
+
+    return {**body, "items": {"item": items}}
+
+
+async def _fetch_page_async(http: AsyncClient, params: dict) -> dict:
+    cached = weather_cache.get(params)
+    if cached is not None:
+        return cached
+
+    with kma_timer() as call:
+        response = await http.get(KMA_API_URL, params=params)
+        call["status"] = response.status_code
+    body = parse_kma_body(response.json())
+    if is_final_range(params):
+        weather_cache.put(params, body)
     return body
 
+
+async def fetch_weather_data_async(
+    http: AsyncClient,
+    start_date: str,
+    end_date: str,
+):
+    """
+    fetch_weather_data의 비동기 버전 (KMA 응답을 기다리는 동안 작업 스레드를 점유하지 않음)
+    """
+    num_of_rows = _num_of_rows(start_date, end_date)
+
+    body = await _fetch_page_async(http, kma_params(start_date, end_date, 1, num_of_rows))
+    items = list(body_items(body))
+    total_pages = ceil(int(body.get("totalCount") or 0) / num_of_rows)
+    for page_no in range(2, total_pages + 1):
+        page = await _fetch_page_async(http, kma_params(start_date, end_date, page_no, num_of_rows))
+        items.extend(body_items(page))
+
+    return {**body, "items": {"item": items}}
+
+
+def store_weather_items(
+    session: SessionDep,
+    items: List[dict],
+) -> List[Weather]:
+    """
+    KMA 응답 아이템을 weather 테이블에 upsert하고 해당 날짜 판매를 동기화 처리
+
+    날짜 수와 관계없이 upsert 1회, 판매 동기화 update 1회로 처리하며
+    이미 저장된 날짜는 새 관측값으로 갱신한다. 커밋은 호출자가 수행한다.
+    """
+    weathers = {weather.date: weather for weather in map(_to_weather, items)}
+    if not weathers:
+        return []
+
+    stmt = upsert_insert(session, Weather.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["date"],
+        set_={
+            column.name: stmt.excluded[column.name]
+            for column in Weather.__table__.columns
+            if column.name != "date" and column.computed is None
+        },
+    )
+    session.exec(stmt, params=[weather.model_dump() for weather in weathers.values()])
+    session.exec(
+        update(Sale).
+        where(sale_input_day.in_([day_key(weather_date) for weather_date in weathers])).
+        values(sync_status=SYNC_DONE)
+    )
+    return list(weathers.values())
+
+
 def read_weathers_by_input_date(
     session: SessionDep,
     start_date: str,
@@ -100,8 +346,8 @@ def read_weathers_by_input_date(
 ) -> List[Weather]:
     weathers = session.exec(
         select(Weather)
-        .where(Weather.date >= start_date, Weather.date <= end_date)
-        .order_by(Weather.date)
+        .where(weather_day.between(day_key(start_date), day_key(end_date)))
+        .order_by(weather_day)
     ).all()
     return weathers
 
@@ -110,9 +356,22 @@ def read_weathers_by_month(
     session: SessionDep,
     month: str,
 ) -> List[Weather]:
+    try:
+        first_day, last_day = month_key_bounds(month)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="month must be YYYY-MM")
+
+    # weather.date 형식(YYYYMMDD/YYYY-MM-DD)과 관계없이 일 번호 범위로 조회
     weathers = session.exec(
         select(Weather)
-        .where(Weather.date.startswith(month))
-        .order_by(Weather.date)
+        .where(weather_day.between(first_day, last_day))
+        .order_by(weather_day)
     ).all()
     return weathers
+
+
+async def read_weathers_by_month_async(
+    session: AsyncSession,
+    month: str,
+) -> List[Weather]:
+    return await session.run_sync(read_weathers_by_month, month)
@@ -0,0 +1,214 @@
+"""
+KMA 일별 ASOS 날씨 백필 엔진
+
+날씨가 없는 판매 날짜를 연속 구간으로 묶고 페이지 크기 단위의 날짜 범위로 나눈 뒤,
+하나의 httpx.AsyncClient 커넥션 풀로 동시에 조회(동시성 제한, 재시도/백오프, 전체 페이지 조회)하고
+결과를 배치 단위로 weather 테이블에 저장한다.
+"""
+import asyncio
+import random
+from datetime import date, timedelta
+from math import ceil
+from typing import List, Optional, Set, Tuple
+
+import httpx
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.db import SessionDep
+from core.data_version import bump_data_version
+from core.metrics import kma_timer
+from models.weather import WeatherBackfillResponse
+from utils.weather_cache import weather_cache
+from service.weather import (
+    KMA_API_URL,
+    kma_params,
+    parse_kma_body,
+    body_items,
+    is_final_range,
+    store_weather_items,
+    find_missing_weather_dates,
+    merge_date_ranges,
+    mark_synced_sales,
+    mark_failed_dates,
+)
+
+# KMA 조회 한 페이지의 행 수 (일 단위이므로 범위 분할 크기와 같음)
+KMA_PAGE_SIZE = 365
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5  # 초
+STORE_BATCH_SIZE = 500
+
+
+class RetryableKmaError(Exception):
+    pass
+
+
+def split_date_range(start: date, end: date, days: int) -> List[Tuple[date, date]]:
+    """
+    [start, end] 구간을 최대 days일 길이의 연속 구간으로 분할
+    """
+    ranges: List[Tuple[date, date]] = []
+    current = start
+    while current <= end:
+        range_end = min(current + timedelta(days=days - 1), end)
+        ranges.append((current, range_end))
+        current = range_end + timedelta(days=1)
+    return ranges
+
+
+async def _request_page(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    params: dict,
+    retries: int,
+    backoff: float,
+) -> dict:
+    cached = weather_cache.get(params)
+    if cached is not None:
+        return cached
+
+    for attempt in range(retries + 1):
+        try:
+            async with semaphore:
+                with kma_timer() as call:
+                    response = await client.get(KMA_API_URL, params=params)
+                    call["status"] = response.status_code
+            if response.status_code == 429 or response.status_code >= 500:
+                raise RetryableKmaError(f"KMA responded {response.status_code}")
+            try:
+                payload = response.json()
+            except ValueError:
+                # 한도 초과 등 일시 오류 시 XML 본문이 오는 경우
+                raise RetryableKmaError("KMA returned a non-JSON body")
+            body = parse_kma_body(payload)
+            if is_final_range(params):
+                weather_cache.put(params, body)
+            return body
+        except (httpx.TransportError, RetryableKmaError):
+            if attempt == retries:
+                raise
+            await asyncio.sleep(backoff * (2 ** attempt) + random.uniform(0, backoff))
+    raise RuntimeError("unreachable")
+
+
+async def fetch_weather_range(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    start: date,
+    end: date,
+    page_size: int = KMA_PAGE_SIZE,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+) -> List[dict]:
+    """
+    한 날짜 범위의 모든 페이지 조회
+    """
+    start_dt, end_dt = start.strftime("%Y%m%d"), end.strftime("%Y%m%d")
+    first = await _request_page(
+        client, semaphore, kma_params(start_dt, end_dt, 1, page_size), retries, backoff
+    )
+    items = body_items(first)
+
+    total_pages = ceil(int(first.get("totalCount") or 0) / page_size)
+    if total_pages > 1:
+        pages = await asyncio.gather(*[
+            _request_page(client, semaphore, kma_params(start_dt, end_dt, page_no, page_size), retries, backoff)
+            for page_no in range(2, total_pages + 1)
+        ])
+        for body in pages:
+            items.extend(body_items(body))
+    return items
+
+
+def _plan_missing_dates(session: SessionDep, start: Optional[date], end: Optional[date]) -> List[date]:
+    mark_synced_sales(session)
+    session.commit()
+    # KMA 일자료는 전날까지만 제공
+    end = min(end or date.max, date.today() - timedelta(days=1))
+    return find_missing_weather_dates(session, start, end)
+
+
+def _store_and_commit(session: SessionDep, items: List[dict]) -> List[str]:
+    stored = [weather.date for weather in store_weather_items(session, items)]
+    bump_data_version(session)
+    session.commit()
+    return stored
+
+
+def _mark_failed_and_commit(session: SessionDep, missing: List[date], stored_dates: Set[str]) -> None:
+    mark_failed_dates(session, missing, stored_dates)
+    session.commit()
+
+
+async def backfill_weather(
+    session: AsyncSession,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    page_size: int = KMA_PAGE_SIZE,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    client: Optional[httpx.AsyncClient] = None,
+) -> WeatherBackfillResponse:
+    """
+    날씨 백필 실행
+
+    날씨가 없는 미동기화 판매 날짜만 연속 구간으로 묶어 조회한다.
+
+    Args:
+        session: DB 세션
+        start, end: 백필 대상 판매 날짜 범위 (미지정 시 전체)
+        concurrency: 동시에 진행할 KMA 요청 수
+        page_size: 범위 분할 크기이자 페이지당 행 수
+        retries: 요청당 재시도 횟수 (지수 백오프)
+        client: 외부에서 주입할 AsyncClient (로컬 KMA 대체 서버 테스트용)
+    """
+    missing = await session.run_sync(_plan_missing_dates, start, end)
+    ranges = [
+        page_range
+        for range_start, range_end in merge_date_ranges(missing)
+        for page_range in split_date_range(range_start, range_end, page_size)
+    ]
+    if not ranges:
+        return WeatherBackfillResponse(ranges=0, fetched=0, stored=0)
+
+    owns_client = client is None
+    if owns_client:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+
+    semaphore = asyncio.Semaphore(concurrency)
+    fetched = 0
+    stored_dates: Set[str] = set()
+    pending: List[dict] = []
+
+    try:
+        tasks = [
+            asyncio.create_task(
+                fetch_weather_range(client, semaphore, range_start, range_end, page_size, retries, backoff)
+            )
+            for range_start, range_end in ranges
+        ]
+        try:
+            for task in asyncio.as_completed(tasks):
+                items = await task
+                fetched += len(items)
+                pending.extend(items)
+                if len(pending) >= STORE_BATCH_SIZE:
+                    stored_dates.update(await session.run_sync(_store_and_commit, pending))
+                    pending = []
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if pending:
+            stored_dates.update(await session.run_sync(_store_and_commit, pending))
+    finally:
+        if owns_client:
+            await client.aclose()
+
+    await session.run_sync(_mark_failed_and_commit, missing, stored_dates)
+    return WeatherBackfillResponse(ranges=len(ranges), fetched=fetched, stored=len(stored_dates))
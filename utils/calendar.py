@@ -0,0 +1,96 @@
+"""
+날짜 키와 주/월 구간 계산
+
+날짜는 1970-01-01 기준 일 번호(day key, 정수)로 다룬다. (numpy datetime64[D]와 같은 값)
+문자열 변환과 주/월 구간 계산은 메모이즈되어 같은 날짜는 한 번만 계산한다.
+주는 월요일 ~ 토요일이며, 일요일은 다음 주 월요일에 속한다.
+"""
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Tuple
+
+from sqlalchemy import Column, Computed, Integer, Table
+
+EPOCH = date(1970, 1, 1)
+# 메모이즈할 최대 날짜 수 (사용자 입력 날짜로 무한히 커지지 않도록 제한)
+CACHE_SIZE = 1 << 16
+
+
+def day_key_sql(column: str) -> str:
+    """
+    문자열 날짜 열(YYYY-MM-DD 또는 YYYYMMDD)을 일 번호로 바꾸는 SQLite 식 (생성 열용)
+    """
+    iso = (
+        f"CASE WHEN length({column}) = 8 "
+        f"THEN substr({column}, 1, 4) || '-' || substr({column}, 5, 2) || '-' || substr({column}, 7, 2) "
+        f"ELSE {column} END"
+    )
+    return f"CAST(julianday({iso}) - 2440587.5 AS INTEGER)"
+
+
+def day_key_column(table: Table, name: str, source: str) -> Column:
+    """
+    table에 source 날짜 문자열의 일 번호 생성 열(VIRTUAL)을 추가
+
+    모델 필드가 아니므로 API 응답과 ORM 입력에는 나타나지 않고, 조회 조건/조인에만 사용한다.
+    기존 DB에는 core/migrations.py가 같은 열을 추가한다.
+    """
+    column = Column(name, Integer, Computed(day_key_sql(source), persisted=False))
+    table.append_column(column)
+    return column
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def day_key(value: str) -> int:
+    """
+    'YYYY-MM-DD' 또는 'YYYYMMDD' -> 일 번호 (형식이 잘못되면 ValueError)
+    """
+    if len(value) == 8 and value.isdigit():
+        value = f"{value[:4]}-{value[4:6]}-{value[6:]}"
+    return (date.fromisoformat(value) - EPOCH).days
+
+
+def date_key(value: date) -> int:
+    return (value - EPOCH).days
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def day_date(day: int) -> date:
+    return EPOCH + timedelta(days=day)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def day_str(day: int) -> str:
+    """
+    일 번호 -> 'YYYY-MM-DD'
+    """
+    return day_date(day).isoformat()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def week_bounds(day: int) -> Tuple[int, int]:
+    """
+    일 번호가 속한 주의 (월요일, 토요일)
+    """
+    weekday = day_date(day).weekday()
+    monday = day + 1 if weekday == 6 else day - weekday
+    return monday, monday + 5
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def month_bounds(day: int) -> Tuple[int, int]:
+    """
+    일 번호가 속한 달의 (1일, 말일)
+    """
+    current = day_date(day)
+    first = current.replace(day=1)
+    next_month = date(first.year + first.month // 12, first.month % 12 + 1, 1)
+    return date_key(first), date_key(next_month) - 1
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def month_key_bounds(month: str) -> Tuple[int, int]:
+    """
+    'YYYY-MM' -> 그 달의 (1일, 말일) 일 번호
+    """
+    return month_bounds(day_key(f"{month}-01"))
@@ -0,0 +1,69 @@
+"""
+내보내기 응답 직렬화 (CSV/NDJSON 스트리밍)
+
+조회 결과를 yield_per로 청크 단위로 읽어 바로 바이트로 만든다.
+전체 기간을 내보내도 메모리는 청크 크기에 비례하고, 테이블은 한 번만 읽는다.
+CSV는 헤더가 있는 형식으로 /sale/bulk 입력(utils/sale_import.py)과 호환된다.
+"""
+import csv
+import io
+from datetime import datetime
+from typing import Any, Iterator, Sequence
+
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from utils.json_response import dumps
+
+EXPORT_CSV = "csv"
+EXPORT_NDJSON = "ndjson"
+EXPORT_FORMAT_PATTERN = f"^({EXPORT_CSV}|{EXPORT_NDJSON})$"
+EXPORT_MEDIA_TYPES = {
+    EXPORT_CSV: "text/csv; charset=utf-8",
+    EXPORT_NDJSON: "application/x-ndjson",
+}
+
+# 한 번에 읽어 직렬화할 행 수
+EXPORT_CHUNK_SIZE = 5000
+
+
+def _csv_value(value: Any) -> Any:
+    # datetime은 JSON 응답과 같은 ISO 8601 문자열, None은 빈 칸
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return "" if value is None else value
+
+
+def encode_rows(fields: Sequence[str], rows: Sequence[Sequence[Any]], export_format: str) -> bytes:
+    """
+    행 목록 -> CSV 줄 또는 NDJSON 줄 (행의 값 순서는 fields와 같아야 함)
+    """
+    if export_format == EXPORT_NDJSON:
+        return b"".join(dumps(dict(zip(fields, row))) + b"\n" for row in rows)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def iter_export(
+    engine: Engine,
+    query,
+    fields: Sequence[str],
+    export_format: str,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    조회 결과를 chunk_size 행씩 CSV/NDJSON 바이트로 반환 (StreamingResponse 본문)
+
+    스트림은 요청의 의존성 세션이 닫힌 뒤에도 이어지므로 세션을 직접 열고,
+    한 번의 SELECT로 읽으므로 내보내는 동안의 쓰기와 섞이지 않는다.
+    """
+    if export_format == EXPORT_CSV:
+        yield encode_rows(fields, [fields], EXPORT_CSV)
+
+    with Session(engine) as session:
+        result = session.exec(query.execution_options(yield_per=chunk_size))
+        for rows in result.partitions():
+            yield encode_rows(fields, rows, export_format)
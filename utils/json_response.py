@@ -0,0 +1,51 @@
+"""
+응답 JSON 직렬화 (orjson)
+
+SQL 결과 행을 Pydantic 응답 모델을 거치지 않고 바로 JSON 바이트로 만든다.
+필드 이름과 순서를 응답 모델과 맞추면 응답 스키마는 그대로다. (datetime은 ISO 8601 문자열)
+"""
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import orjson
+
+# 응답 형식 (format 쿼리 파라미터)
+FORMAT_ROWS = "rows"          # 객체 배열 (기본)
+FORMAT_COLUMNAR = "columnar"  # 필드별 배열
+FORMAT_PATTERN = f"^({FORMAT_ROWS}|{FORMAT_COLUMNAR})$"
+
+
+def dumps(value: Any) -> bytes:
+    return orjson.dumps(value)
+
+
+def dump_records(fields: Sequence[str], rows: Iterable[Sequence[Any]]) -> bytes:
+    """
+    행 목록 -> JSON 객체 배열 (행의 값 순서는 fields와 같아야 함)
+    """
+    return orjson.dumps([dict(zip(fields, row)) for row in rows])
+
+
+def dump_columns(
+    fields: Sequence[str],
+    rows: Sequence[Sequence[Any]],
+    dictionaries: Optional[Dict[str, str]] = None,
+) -> bytes:
+    """
+    조회 결과 행(튜플) 목록 -> 열 단위 JSON 객체 {필드: [값, ...]}
+
+    행 dict를 만들지 않고 zip으로 한 번에 열로 바꾼다. (행의 값 순서는 fields와 같아야 함)
+    dictionaries의 필드({필드: 사전 키})는 고유 값 목록을 사전 키로 한 번만 담고,
+    열에는 그 목록의 인덱스를 담는다.
+    """
+    columns = list(zip(*rows)) if rows else [()] * len(fields)
+    body: Dict[str, Any] = {}
+    for field, values in zip(fields, columns):
+        key = (dictionaries or {}).get(field)
+        if key is None:
+            body[field] = values
+            continue
+        names = sorted(set(values))
+        index = {name: code for code, name in enumerate(names)}
+        body[key] = names
+        body[field] = [index[value] for value in values]
+    return orjson.dumps(body)
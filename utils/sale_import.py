@@ -0,0 +1,103 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Iterable, List, Optional
+
+
+def _split_lines(buffer: str) -> tuple:
+    # 마지막 줄은 다음 청크와 이어질 수 있으므로 남겨둔다
+    *lines, rest = buffer.split("\n")
+    return [line.rstrip("\r") for line in lines], rest
+
+
+def _split_csv_records(buffer: str) -> tuple:
+    # 따옴표 안의 줄바꿈은 필드 값이므로, 따옴표 수가 짝수가 될 때까지 줄을 이어 붙여 레코드 단위로 나눈다
+    lines, rest = _split_lines(buffer)
+    records: List[str] = []
+    pending: List[str] = []
+    open_quote = False
+    for line in lines:
+        pending.append(line)
+        open_quote ^= line.count('"') % 2 == 1
+        if not open_quote:
+            records.append("\n".join(pending))
+            pending = []
+    if pending:
+        # 닫히지 않은 레코드는 다음 청크와 이어 붙인다
+        rest = "\n".join(pending + [rest])
+    return records, rest
+
+
+def _parse_ndjson(lines: Iterable[str]) -> List[Optional[dict]]:
+    records: List[Optional[dict]] = []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            record = None
+        records.append(record if isinstance(record, dict) else None)
+    return records
+
+
+async def iter_sale_records(
+    chunks: AsyncIterator[bytes],
+    content_type: str,
+) -> AsyncIterator[Optional[dict]]:
+    """
+    요청 본문을 판매 레코드(dict)로 변환
+
+    - application/json: JSON 배열 (본문 전체를 읽은 뒤 파싱)
+    - application/x-ndjson: 한 줄에 JSON 객체 하나 (스트리밍)
+    - text/csv: 헤더가 있는 CSV (스트리밍)
+
+    파싱할 수 없는 레코드는 None으로 반환한다.
+    """
+    media_type = content_type.split(";")[0].strip().lower()
+
+    if media_type in ("application/json", ""):
+        body = b"".join([chunk async for chunk in chunks])
+        try:
+            records = json.loads(body or b"[]")
+        except json.JSONDecodeError:
+            raise ValueError("Invalid JSON body")
+        if not isinstance(records, list):
+            raise ValueError("JSON body must be an array")
+        for record in records:
+            yield record if isinstance(record, dict) else None
+        return
+
+    if media_type not in ("application/x-ndjson", "application/jsonl", "text/csv"):
+        raise ValueError(f"Unsupported content type: {media_type}")
+
+    is_csv = media_type == "text/csv"
+    header: Optional[List[str]] = None
+    # 청크 경계에서 잘린 멀티바이트 문자(한글 결제 타입 등)를 위해 점진적으로 디코딩
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        if not is_csv:
+            lines, buffer = _split_lines(buffer)
+            for record in _parse_ndjson(lines):
+                yield record
+            continue
+        lines, buffer = _split_csv_records(buffer)
+        for row in csv.reader(line for line in lines if line.strip()):
+            if header is None:
+                header = [name.strip() for name in row]
+                continue
+            yield dict(zip(header, row)) if len(row) == len(header) else None
+
+    buffer += decoder.decode(b"", final=True)
+    if buffer.strip():
+        if not is_csv:
+            for record in _parse_ndjson([buffer]):
+                yield record
+        else:
+            for row in csv.reader([buffer]):
+                if header is None:
+                    break
+                yield dict(zip(header, row)) if len(row) == len(header) else None
@@ -0,0 +1,118 @@
+"""
+KMA 응답 디스크 캐시
+
+지점/기간/페이지 단위로 KMA 응답 body를 JSON 파일로 저장한다.
+전체 크기가 한도를 넘으면 가장 오래 사용하지 않은 파일부터 삭제한다.
+
+환경 변수:
+    KMA_CACHE_MODE: on (기본, 조회 후 저장) / off (사용 안 함) / replay (캐시만 사용, 네트워크 호출 없음)
+    KMA_CACHE_DIR: 캐시 디렉터리 (기본: 프로젝트 루트의 .cache/kma)
+    KMA_CACHE_MAX_BYTES: 최대 크기 (기본 50MB)
+"""
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+CACHE_MODE_ON = "on"
+CACHE_MODE_OFF = "off"
+CACHE_MODE_REPLAY = "replay"
+
+# 캐시 키에 포함할 요청 파라미터 (serviceKey 제외)
+_KEY_PARAMS = ("stnIds", "startDt", "endDt", "pageNo", "numOfRows", "dataCd", "dateCd")
+
+
+class WeatherCacheMiss(Exception):
+    """replay 모드에서 캐시에 없는 요청"""
+
+
+class WeatherResponseCache:
+    def __init__(self, directory: Path, max_bytes: int, mode: str = CACHE_MODE_ON):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.mode = mode
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "WeatherResponseCache":
+        default_dir = Path(__file__).resolve().parent.parent / ".cache" / "kma"
+        return cls(
+            directory=Path(os.getenv("KMA_CACHE_DIR", default_dir)),
+            max_bytes=int(os.getenv("KMA_CACHE_MAX_BYTES", 50 * 1024 * 1024)),
+            mode=os.getenv("KMA_CACHE_MODE", CACHE_MODE_ON).lower(),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in (CACHE_MODE_ON, CACHE_MODE_REPLAY)
+
+    @property
+    def replay(self) -> bool:
+        return self.mode == CACHE_MODE_REPLAY
+
+    def _path(self, params: dict) -> Path:
+        key = "|".join(f"{name}={params.get(name)}" for name in _KEY_PARAMS)
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.json"
+
+    def get(self, params: dict) -> Optional[dict]:
+        """
+        캐시된 body 반환 (없으면 None, replay 모드에서는 WeatherCacheMiss)
+        """
+        if not self.enabled:
+            return None
+        path = self._path(params)
+        try:
+            body = json.loads(path.read_bytes())
+            os.utime(path)  # LRU 기준 시각 갱신
+            return body
+        except (FileNotFoundError, ValueError):
+            if self.replay:
+                raise WeatherCacheMiss(
+                    f"{params.get('startDt')}~{params.get('endDt')} page {params.get('pageNo')} is not cached"
+                )
+            return None
+
+    def put(self, params: dict, body: dict) -> None:
+        if self.mode != CACHE_MODE_ON:
+            return
+        path = self._path(params)
+        data = json.dumps(body, ensure_ascii=False).encode()
+
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            size = self._current_size()
+            previous = path.stat().st_size if path.exists() else 0
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+
+            self._size = size + len(data) - previous
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _current_size(self) -> int:
+        if self._size is None:
+            self._size = sum(path.stat().st_size for path in self.directory.glob("*/*.json"))
+        return self._size
+
+    def _evict(self) -> None:
+        # 오래 사용하지 않은 파일부터 한도의 90%까지 삭제
+        files = sorted(
+            ((path.stat().st_mtime, path.stat().st_size, path) for path in self.directory.glob("*/*.json")),
+            key=lambda entry: entry[0],
+        )
+        size = sum(entry[1] for entry in files)
+        target = int(self.max_bytes * 0.9)
+        for _, file_size, path in files:
+            if size <= target:
+                break
+            path.unlink(missing_ok=True)
+            size -= file_size
+        self._size = size
+
+
+weather_cache = WeatherResponseCache.from_env()